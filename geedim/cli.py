@@ -13,14 +13,16 @@
     See the License for the specific language governing permissions and
     limitations under the License.
 """
+import functools
 import json
 import logging
 import os
 import pathlib
 import re
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from types import SimpleNamespace
-from typing import List
+from typing import Callable, List
 
 import click
 import rasterio as rio
@@ -33,10 +35,26 @@ from geedim.collection import MaskedCollection
 from geedim.download import BaseImage, supported_dtypes
 from geedim.enums import CloudMaskMethod, CompositeMethod, ExportType, ResamplingMethod
 from geedim.mask import MaskedImage
+from geedim.stac import StacCatalog
 from geedim.utils import Spinner, asset_id, get_bounds
 
+try:
+    # use the faster orjson library for reading (potentially large) region files, if it is installed
+    import orjson
+except ImportError:
+    orjson = None
+
+json_loads = orjson.loads if orjson else json.loads
+
 logger = logging.getLogger(__name__)
 
+# click.Choice values, built once at import
+_resampling_choices = tuple(rm.value for rm in ResamplingMethod)
+_mask_method_choices = tuple(cmm.value for cmm in CloudMaskMethod)
+_export_type_choices = tuple(t.value for t in ExportType)
+_comp_method_choices = tuple(cm.value for cm in CompositeMethod)
+_dtype_choices = tuple(supported_dtypes)
+
 
 class PlainInfoFormatter(logging.Formatter):
     """logging formatter to format INFO logs without the module name etc prefix"""
@@ -49,40 +67,67 @@ class PlainInfoFormatter(logging.Formatter):
         return super().format(record)
 
 
+# substitutions to strip some RST markup from help text for CLI display.  Assumes no grid tables.
+_rst_help_subs = [
+    (re.compile(sub_key, flags=re.DOTALL), sub_value)
+    for sub_key, sub_value in {
+        "\b\n": "\n\b",  # convert from RST friendly to click literal (unwrapped) block marker
+        r"\| ": "",  # strip RST literal (unwrapped) marker in e.g. tables and bullet lists
+        "\n\\.\\. _.*:\n": "",  # strip RST ref directive '\n.. _<name>:\n'
+        "::": ":",  # convert from RST '::' to ':'
+        "``(.*?)``": r"\g<1>",  # convert from RST '``literal``' to 'literal'
+        ":option:`(.*?)( <.*?>)?`": r"\g<1>",  # convert ':option:`--name <group-command --name>`' to '--name'
+        ":option:`(.*?)`": r"\g<1>",  # convert ':option:`--name`' to '--name'
+        "`([^<]*) <([^>]*)>`_": r"\g<1>",  # convert from RST cross-ref '`<name> <<link>>`_' to 'name'
+    }.items()
+]  # yapf: disable
+
+
+def _strip_rst(text: str) -> str:
+    """Strip some RST markup from the given help text."""
+    for sub_re, sub_value in _rst_help_subs:
+        text = sub_re.sub(sub_value, text)
+    return text
+
+
+class RstHelpFormatter(click.HelpFormatter):
+    """click HelpFormatter sub-class that strips RST markup from help text and option descriptions."""
+
+    def write_text(self, text):
+        super().write_text(_strip_rst(text))
+
+    def write_dl(self, rows, *args, **kwargs):
+        rows = [(term, _strip_rst(help_text)) for term, help_text in rows]
+        super().write_dl(rows, *args, **kwargs)
+
+
+class RstHelpContext(click.Context):
+    """click Context sub-class that formats help with :class:`RstHelpFormatter`."""
+
+    formatter_class = RstHelpFormatter
+
+
 class ChainedCommand(click.Command):
     """
     click Command sub-class for managing parameters shared between chained commands.
+
+    Earth Engine is initialised on invocation, unless the command is created with ``requires_ee=False``.
     """
 
-    def get_help(self, ctx):
-        """Strip some RST markup from the help text for CLI display.  Assumes no grid tables."""
-        if not hasattr(self, "click_wrap_text"):
-            self.click_wrap_text = click.formatting.wrap_text
-
-        sub_strings = {
-            "\b\n": "\n\b",  # convert from RST friendly to click literal (unwrapped) block marker
-            r"\| ": "",  # strip RST literal (unwrapped) marker in e.g. tables and bullet lists
-            "\n\\.\\. _.*:\n": "",  # strip RST ref directive '\n.. _<name>:\n'
-            "::": ":",  # convert from RST '::' to ':'
-            "``(.*?)``": r"\g<1>",  # convert from RST '``literal``' to 'literal'
-            ":option:`(.*?)( <.*?>)?`": r"\g<1>",  # convert ':option:`--name <group-command --name>`' to '--name'
-            ":option:`(.*?)`": r"\g<1>",  # convert ':option:`--name`' to '--name'
-            "`([^<]*) <([^>]*)>`_": r"\g<1>",  # convert from RST cross-ref '`<name> <<link>>`_' to 'name'
-        }  # yapf: disable
-
-        def reformat_text(text, width, **kwargs):
-            for sub_key, sub_value in sub_strings.items():
-                text = re.sub(sub_key, sub_value, text, flags=re.DOTALL)
-            return self.click_wrap_text(text, width, **kwargs)
-
-        click.formatting.wrap_text = reformat_text
-        return click.Command.get_help(self, ctx)
+    # format help with RST markup stripped (the RST is left in place for the sphinx docs)
+    context_class = RstHelpContext
+
+    def __init__(self, *args, requires_ee: bool = True, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requires_ee = requires_ee
 
     def invoke(self, ctx):
         """Manage shared `image_list` and `region` parameters."""
 
-        # initialise earth engine (do it here, rather than in cli() so that it does not delay --help)
-        Initialize()
+        # initialise earth engine (do it here, rather than in cli() so that it does not delay --help), and only for
+        # commands that need it
+        if self.requires_ee:
+            Initialize()
 
         # combine `region` and `bbox` into a single region in the context object
         region = ctx.params["region"] if "region" in ctx.params else None
@@ -93,7 +138,7 @@ class ChainedCommand(click.Command):
 
         if "image_id" in ctx.params:
             # append any image id's to the image_list
-            ctx.obj.image_list += list(ctx.params["image_id"])
+            ctx.obj.image_list.extend(ctx.params["image_id"])
 
         if ("like" in ctx.params) and (ctx.params["like"] is not None):
             # populate crs, crs_transform & shape parameters from a template raster
@@ -128,16 +173,28 @@ def _collection_cb(ctx, param, value):
     return value
 
 
+@functools.lru_cache(maxsize=128)
+def _crs_to_wkt(crs: str) -> str:
+    """Parse a CRS string and return its WKT.  Results are cached to avoid repeated PROJ lookups."""
+    return rio_crs.CRS.from_string(crs).to_wkt()
+
+
+@functools.lru_cache(maxsize=32)
+def _read_wkt_file(filename: str, mtime: float) -> str:
+    """Read a WKT file.  ``mtime`` is part of the cache key so that modified files are re-read."""
+    with open(filename, "r") as f:
+        return f.read()
+
+
 def _crs_cb(ctx, param, crs):
     """click callback to validate and parse the CRS."""
     if crs is not None:
         try:
             wkt_fn = pathlib.Path(crs)
             if wkt_fn.exists():  # read WKT from file, if it exists
-                with open(wkt_fn, "r") as f:
-                    crs = f.read()
+                crs = _read_wkt_file(str(wkt_fn), wkt_fn.stat().st_mtime)
 
-            crs = rio_crs.CRS.from_string(crs).to_wkt()
+            crs = _crs_to_wkt(crs)
         except CRSError as ex:
             raise click.BadParameter(
                 f"Invalid CRS value: {crs}.\n {str(ex)}", param=param
@@ -149,14 +206,14 @@ def _bbox_cb(ctx, param, value):
     """click callback to validate and parse --bbox"""
     if isinstance(value, tuple) and len(value) == 4:  # --bbox
         xmin, ymin, xmax, ymax = value
-        coordinates = [
-            [xmax, ymax],
-            [xmax, ymin],
-            [xmin, ymin],
-            [xmin, ymax],
-            [xmax, ymax],
-        ]
-        value = dict(type="Polygon", coordinates=[coordinates])
+        coordinates = (
+            (xmax, ymax),
+            (xmax, ymin),
+            (xmin, ymin),
+            (xmin, ymax),
+            (xmax, ymax),
+        )
+        value = dict(type="Polygon", coordinates=(coordinates,))
     elif value is not None and len(value) != 0:
         raise click.BadParameter(f"Invalid bbox: {value}.", param=param)
     return value
@@ -168,7 +225,7 @@ def _region_cb(ctx, param, value):
     if isinstance(value, str):  # read region file/string
         if value == "-" or "json" in value:
             with click.open_file(value, encoding="utf-8") as f:
-                value = json.load(f)
+                value = json_loads(f.read())
         else:
             value = get_bounds(value, expand=10)
     elif value is not None and len(value) != 0:
@@ -217,6 +274,32 @@ def _prepare_image_list(obj: SimpleNamespace, mask=False) -> List[MaskedImage,]:
     return image_list
 
 
+def _map_images(func: Callable, image_list: List, max_workers: int = 1) -> List:
+    """
+    Apply ``func`` to each item in ``image_list`` with a pool of ``max_workers`` threads.  Results are returned in
+    ``image_list`` order.  A failure in one item does not cancel the others.  The first failure is re-raised once all
+    items have completed, and any later failures are logged.
+    """
+    results = [None] * len(image_list)
+    first_ex = None
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {executor.submit(func, item): i for i, item in enumerate(image_list)}
+        for future in as_completed(futures):
+            i = futures[future]
+            try:
+                results[i] = future.result()
+            except Exception as ex:
+                if first_ex is None:
+                    # reported when re-raised below
+                    first_ex = ex
+                else:
+                    item = image_list[i]
+                    logger.error(f"{getattr(item, 'name', item)}: {str(ex)}")
+    if first_ex:
+        raise first_ex
+    return results
+
+
 # Define click options that are common to more than one command
 bbox_option = click.option(
     "-b",
@@ -256,7 +339,7 @@ scale_option = click.option(
 dtype_option = click.option(
     "-dt",
     "--dtype",
-    type=click.Choice(supported_dtypes, case_sensitive=False),
+    type=click.Choice(_dtype_choices, case_sensitive=False),
     default=None,
     show_default="smallest data type able to represent the range of pixel values.",
     help="Data type to convert image(s) to.",
@@ -272,7 +355,7 @@ mask_option = click.option(
 resampling_option = click.option(
     "-rs",
     "--resampling",
-    type=click.Choice([rm.value for rm in ResamplingMethod], case_sensitive=True),
+    type=click.Choice(_resampling_choices, case_sensitive=True),
     default=BaseImage._default_resampling.value,
     show_default=True,
     callback=_resampling_method_cb,
@@ -317,13 +400,36 @@ like_option = click.option(
 @click.group(chain=True)
 @click.option("--verbose", "-v", count=True, help="Increase verbosity.")
 @click.option("--quiet", "-q", count=True, help="Decrease verbosity.")
+@click.option(
+    "--info-cache-dir",
+    type=click.Path(file_okay=False, path_type=pathlib.Path),
+    envvar="GEEDIM_INFO_CACHE_DIR",
+    show_envvar=True,
+    default=None,
+    help="Directory in which to cache Earth Engine image metadata for 24 hours, and STAC data for 7 days.  "
+    "Metadata is not cached if this is not specified.",
+)
 @click.version_option(version=version.__version__, message="%(version)s")
 @click.pass_context
-def cli(ctx, verbose, quiet):
+def cli(ctx, verbose, quiet, info_cache_dir):
     """Search, composite and download Google Earth Engine imagery."""
     ctx.obj = SimpleNamespace(image_list=[], region=None, cloud_kwargs={})
     verbosity = verbose - quiet
     _configure_logging(verbosity)
+    # cancel outstanding STAC prefetch requests when the command completes (or fails), so that the interpreter
+    # doesn't wait on them at exit
+    ctx.call_on_close(StacCatalog().shutdown_prefetch)
+    if info_cache_dir is not None:
+        # enable the metadata caches for this command only, restoring the previous settings when it completes, so
+        # that they don't leak into later API use in the same process
+        stac_catalog = StacCatalog()
+        prev_cache_dirs = (BaseImage._info_cache_dir, stac_catalog._cache_dir)
+        BaseImage._info_cache_dir = stac_catalog._cache_dir = info_cache_dir
+
+        def restore_cache_dirs():
+            BaseImage._info_cache_dir, stac_catalog._cache_dir = prev_cache_dirs
+
+        ctx.call_on_close(restore_cache_dirs)
 
 
 # TODO: add clear docs on what is piped out of or into each command.
@@ -334,7 +440,11 @@ def cli(ctx, verbose, quiet):
 
 
 # config command
-@click.command(cls=ChainedCommand, context_settings=dict(auto_envvar_prefix="GEEDIM"))
+@click.command(
+    cls=ChainedCommand,
+    requires_ee=False,
+    context_settings=dict(auto_envvar_prefix="GEEDIM"),
+)
 @click.option(
     "-mc/-nmc",
     "--mask-cirrus/--no-mask-cirrus",
@@ -353,7 +463,7 @@ def cli(ctx, verbose, quiet):
 @click.option(
     "-mm",
     "--mask-method",
-    type=click.Choice([cmm.value for cmm in CloudMaskMethod], case_sensitive=True),
+    type=click.Choice(_mask_method_choices, case_sensitive=True),
     default=CloudMaskMethod.cloud_prob.value,
     show_default=True,
     callback=_mask_method_cb,
@@ -653,9 +763,8 @@ def search(
     if num_images == 0:
         logger.info("No images found\n")
     else:
-        obj.image_list += list(
-            gd_collection.properties.keys()
-        )  # store image ids for chained commands
+        # store image ids for chained commands
+        obj.image_list.extend(gd_collection.properties.keys())
         logger.info(f"{len(gd_collection.properties)} images found\n")
         logger.info(f"Image property descriptions:\n\n{gd_collection.schema_table}\n")
         logger.info(f"Search Results:\n\n{gd_collection.properties_table}")
@@ -732,6 +841,15 @@ cli.add_command(search)
     default=False,
     help="Overwrite the destination file if it exists.",
 )
+@click.option(
+    "-mw",
+    "--max-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Maximum number of images to download concurrently.  Each image is downloaded with multiple threads, "
+    "so increasing this can exceed Earth Engine rate limits.",
+)
 @click.pass_obj
 def download(
     obj,
@@ -744,6 +862,7 @@ def download(
     max_tile_size,
     max_tile_dim,
     overwrite,
+    max_workers,
     **kwargs,
 ):
     # @formatter:off
@@ -800,10 +919,15 @@ def download(
     """
     # @formatter:on
     logger.info("\nDownloading:\n")
-    download_dir = download_dir or os.getcwd()
+    download_dir = pathlib.Path(download_dir or os.getcwd())
     image_list = _prepare_image_list(obj, mask=mask)
-    for im in image_list:
-        filename = pathlib.Path(download_dir).joinpath(im.name + ".tif")
+    # retrieve image metadata with one Earth Engine call, rather than one call per image
+    BaseImage._get_info_batch(image_list)
+    # retrieve STAC data for the images in the background
+    StacCatalog().prefetch(im.id for im in image_list)
+
+    def download_image(im: MaskedImage):
+        filename = download_dir / f"{im.name}.tif"
         im.download(
             filename,
             region=obj.region,
@@ -813,6 +937,8 @@ def download(
             **kwargs,
         )
 
+    _map_images(download_image, image_list, max_workers=max_workers)
+
 
 cli.add_command(download)
 
@@ -830,7 +956,7 @@ cli.add_command(download)
 @click.option(
     "-t",
     "--type",
-    type=click.Choice([t.value for t in ExportType], case_sensitive=True),
+    type=click.Choice(_export_type_choices, case_sensitive=True),
     default=BaseImage._default_export_type.value,
     show_default=True,
     callback=_export_type_cb,
@@ -933,6 +1059,10 @@ def export(obj, image_id, type, folder, bbox, region, like, mask, wait, **kwargs
             "--folder must be specified when exporting to asset", param_hint="--folder"
         )
     image_list = _prepare_image_list(obj, mask=mask)
+    # retrieve image metadata with one Earth Engine call, rather than one call per image
+    BaseImage._get_info_batch(image_list)
+    # retrieve STAC data for the images in the background
+    StacCatalog().prefetch(im.id for im in image_list)
     export_tasks = []
     for im in image_list:
         task = im.export(
@@ -967,7 +1097,7 @@ cli.add_command(export)
     "-cm",
     "--method",
     "method",
-    type=click.Choice([cm.value for cm in CompositeMethod], case_sensitive=False),
+    type=click.Choice(_comp_method_choices, case_sensitive=False),
     default=None,
     callback=_comp_method_cb,
     show_default="`q-mosaic` for cloud/shadow mask supported collections, `mosaic` otherwise.",
@@ -984,7 +1114,7 @@ cli.add_command(export)
 @click.option(
     "-rs",
     "--resampling",
-    type=click.Choice([rm.value for rm in ResamplingMethod], case_sensitive=True),
+    type=click.Choice(_resampling_choices, case_sensitive=True),
     default=BaseImage._default_resampling.value,
     callback=_resampling_method_cb,
     show_default=True,
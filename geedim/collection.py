@@ -14,10 +14,12 @@
     limitations under the License.
 """
 
+import json
 import logging
 import re
 import textwrap as wrap
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Union
 
@@ -58,21 +60,17 @@ def compatible_collections(names: List[str]) -> bool:
     """
     names = list(set(names))  # reduce to unique values
     start_name = names[0]
-    name_matches = [True]
-    landsat_regex = re.compile(r"(LANDSAT/\w{2})(\d{2})(/.*)")
-    start_landsat_match = landsat_regex.search(start_name)
-    for name in names[1:]:
-        name_match = False
-        if start_name == name:
-            name_match = True
-        elif start_landsat_match:
-            landsat_regex = re.compile(
-                rf"{start_landsat_match.groups()[0]}\d\d{start_landsat_match.groups()[-1]}"
-            )
-            if landsat_regex.search(name):
-                name_match = True
-        name_matches.append(name_match)
-    return all(name_matches)
+    if len(names) == 1:
+        return True
+    start_landsat_match = re.search(r"(LANDSAT/\w{2})(\d{2})(/.*)", start_name)
+    if not start_landsat_match:
+        return False
+    # all names are compatible if they are Landsat collections that differ from start_name by the mission number
+    # only.  Compile the regex once, and return on the first incompatible name.
+    landsat_regex = re.compile(
+        rf"{start_landsat_match.groups()[0]}\d\d{start_landsat_match.groups()[-1]}"
+    )
+    return all(landsat_regex.search(name) for name in names[1:])
 
 
 def parse_date(date: Union[datetime, str], var_name=None) -> datetime:
@@ -129,13 +127,17 @@ class MaskedCollection:
             )
         self._name = None
         self._properties = None
+        self._properties_table = None
         self._schema = None
+        self._schema_abbrevs = None
+        self._schema_table = None
         self._filtered = False
         self._ee_collection = ee_collection
         self._add_props = list(add_props) if add_props else None
         self._image_type = None
         self._stac = None
         self._stats_scale = None
+        self._composite_cache = {}
 
     @classmethod
     def from_name(cls, name: str, add_props: List[str] = None) -> "MaskedCollection":
@@ -208,38 +210,34 @@ class MaskedCollection:
         if len(image_list) == 0:
             raise ValueError("`image_list` is empty.")
 
-        im_dict_list = []
-        for image_obj in image_list:
+        def get_im_dict(image_obj) -> Dict:
+            """Return a dict of the EE image, ID and capture date existence for ``image_obj``."""
             if isinstance(image_obj, str):
-                im_dict_list.append(
-                    dict(ee_image=ee.Image(image_obj), id=image_obj, has_date=True)
-                )
+                return dict(ee_image=ee.Image(image_obj), id=image_obj, has_date=True)
             elif isinstance(image_obj, ee.Image):
                 ee_info = image_obj.getInfo()
                 ee_id = ee_info["id"] if "id" in ee_info else None
                 has_date = ("properties" in ee_info) and (
                     "system:time_start" in ee_info["properties"]
                 )
-                im_dict_list.append(
-                    dict(ee_image=ee.Image(image_obj), id=ee_id, has_date=has_date)
-                )
+                return dict(ee_image=ee.Image(image_obj), id=ee_id, has_date=has_date)
             elif isinstance(image_obj, BaseImage):
-                im_dict_list.append(
-                    dict(
-                        ee_image=image_obj.ee_image,
-                        id=image_obj.id,
-                        has_date=image_obj.date is not None,
-                    )
+                return dict(
+                    ee_image=image_obj.ee_image,
+                    id=image_obj.id,
+                    has_date=image_obj.date is not None,
                 )
             else:
                 raise TypeError(f"Unsupported image object type: {type(image_obj)}")
 
+        # ee.Image and BaseImage items require a getInfo() round trip each, so run these concurrently
+        with ThreadPoolExecutor(max_workers=min(10, len(image_list))) as executor:
+            im_dict_list = list(executor.map(get_im_dict, image_list))
+
         # check all images have IDs and capture dates
         if any(
-            [
-                (im_dict["id"] is None) or (not im_dict["has_date"])
-                for im_dict in im_dict_list
-            ]
+            (im_dict["id"] is None) or (not im_dict["has_date"])
+            for im_dict in im_dict_list
         ):
             raise InputImageError(
                 'Image(s) must have "id" and "system:time_start" properties.'
@@ -315,14 +313,16 @@ class MaskedCollection:
             raise UnfilteredError(
                 "`properties` can only be retrieved for collections returned by `search()` and `from_list()`"
             )
-        if not self._properties:
+        if self._properties is None:
             self._properties = self._get_properties(self._ee_collection)
         return self._properties
 
     @property
     def properties_table(self) -> str:
         """:attr:`properties` formatted as a printable table string."""
-        return self._get_properties_table(self.properties)
+        if self._properties_table is None:
+            self._properties_table = self._get_properties_table(self.properties)
+        return self._properties_table
 
     @property
     def schema(self) -> Dict[str, Dict]:
@@ -352,23 +352,32 @@ class MaskedCollection:
                     self._schema[add_prop] = dict(
                         abbrev=abbreviate(add_prop), description=description
                     )
+            # cache the (property name, abbreviation) pairs for formatting property tables
+            self._schema_abbrevs = tuple(
+                (prop_name, prop_dict["abbrev"])
+                for prop_name, prop_dict in self._schema.items()
+            )
         return self._schema
 
     @property
     def schema_table(self) -> str:
         """:attr:`schema` formatted as a printable table string."""
-        table_list = []
-        for prop_name, prop_dict in self.schema.items():
-            description = "\n".join(wrap.wrap(prop_dict["description"], 50))
-            table_list.append(
-                dict(
-                    abbrev=prop_dict["abbrev"], name=prop_name, description=description
+        if self._schema_table is None:
+            table_list = []
+            for prop_name, prop_dict in self.schema.items():
+                description = "\n".join(wrap.wrap(prop_dict["description"], 50))
+                table_list.append(
+                    dict(
+                        abbrev=prop_dict["abbrev"],
+                        name=prop_name,
+                        description=description,
+                    )
                 )
+            headers = {key: key.upper() for key in table_list[0].keys()}
+            self._schema_table = tabulate.tabulate(
+                table_list, headers=headers, floatfmt=".2f", tablefmt="simple"
             )
-        headers = {key: key.upper() for key in table_list[0].keys()}
-        return tabulate.tabulate(
-            table_list, headers=headers, floatfmt=".2f", tablefmt="simple"
-        )
+        return self._schema_table
 
     @property
     def refl_bands(self) -> Union[List[str], None]:
@@ -389,16 +398,17 @@ class MaskedCollection:
         # the properties to retrieve
         prop_key_list = ee.List(list(schema.keys()))
 
-        def aggregrate_props(ee_image, coll_list):
-            im_dict = ee_image.toDictionary(prop_key_list)
-            return ee.List(coll_list).add(im_dict)
+        def set_props_dict(ee_image: ee.Image) -> ee.Image:
+            return ee_image.set("GD_PROPS", ee_image.toDictionary(prop_key_list))
 
-        # retrieve list of dicts of properties of images in ee_collection
+        # retrieve list of dicts of properties of images in ee_collection.  map() is evaluated in parallel on the
+        # server, unlike iterate() which accumulates an ee.List sequentially.  The dicts are retrieved as an ee.List
+        # with aggregate_array(), as retrieving a collection with getInfo() is limited to 5000 elements.
         props_list = []
         try:
-            props_list = ee.List(
-                ee_collection.iterate(aggregrate_props, ee.List([]))
-            ).getInfo()
+            props_list = (
+                ee_collection.map(set_props_dict).aggregate_array("GD_PROPS").getInfo()
+            )
         except ee.EEException as ex:
             if "geometry" in str(ex) and "unbounded" in str(ex):
                 raise ValueError(
@@ -413,6 +423,63 @@ class MaskedCollection:
             props_dict[prop_dict["system:id"]] = prop_dict
         return props_dict
 
+    def _sort_properties(
+        self, properties: Dict, method: CompositeMethod, date: datetime = None
+    ) -> Dict:
+        """
+        Sort the given properties in the same order that :meth:`_prepare_for_composite` sorts the collection,
+        when no region is specified.
+        """
+        if method not in self._sort_methods:
+            return properties
+
+        if date:
+            if not date.tzinfo:
+                date = date.replace(tzinfo=timezone.utc)
+            date_ms = date.timestamp() * 1000
+
+            def sort_key(item):
+                return -abs(item[1]["system:time_start"] - date_ms)
+
+        else:
+
+            def sort_key(item):
+                return item[1]["system:time_start"]
+
+        return OrderedDict(sorted(properties.items(), key=sort_key))
+
+    @staticmethod
+    def _composite_cache_key(
+        method: CompositeMethod,
+        mask: bool,
+        resampling: Union[ResamplingMethod, str],
+        date: datetime,
+        region: Dict,
+        kwargs: Dict,
+    ) -> Union[str, None]:
+        """
+        Return a key for :meth:`composite` parameters in the composite cache, or None if the parameters include
+        Earth Engine objects, and can't be cached.
+        """
+        if isinstance(region, ee.ComputedObject) or any(
+            isinstance(value, ee.ComputedObject) for value in kwargs.values()
+        ):
+            return None
+        key_dict = dict(
+            method=method,
+            mask=mask,
+            resampling=resampling,
+            date=date.isoformat() if date else None,
+            region=region,
+            kwargs=kwargs,
+        )
+        try:
+            # sort keys so that equal dicts with different key orders give the same key
+            return json.dumps(key_dict, sort_keys=True)
+        except TypeError:
+            # parameters that are not JSON serialisable are not cached
+            return None
+
     def _get_properties_table(self, properties: Dict, schema: Dict = None) -> str:
         """
         Format the given properties into a table.  Orders properties (columns) according to :attr:`schema` and
@@ -421,20 +488,32 @@ class MaskedCollection:
         if not schema:
             schema = self.schema
 
+        # (name, abbreviation) pairs of the properties to include, in table column order
+        if schema is self._schema:
+            schema_items = self._schema_abbrevs
+        else:
+            schema_items = [
+                (prop_name, key_dict["abbrev"])
+                for prop_name, key_dict in schema.items()
+            ]
+        time_abbrev = (
+            schema["system:time_start"]["abbrev"]
+            if "system:time_start" in schema
+            else None
+        )
         abbrev_props = []
-        for im_id, im_prop_dict in properties.items():
-            abbrev_dict = OrderedDict()
-            for prop_name, key_dict in schema.items():
-                if prop_name in im_prop_dict:
-                    if (
-                        prop_name == "system:time_start"
-                    ):  # convert timestamp to date string
-                        dt = datetime.utcfromtimestamp(im_prop_dict[prop_name] / 1000)
-                        abbrev_dict[key_dict["abbrev"]] = datetime.strftime(
-                            dt, "%Y-%m-%d %H:%M"
-                        )
-                    else:
-                        abbrev_dict[key_dict["abbrev"]] = im_prop_dict[prop_name]
+        for im_prop_dict in properties.values():
+            abbrev_dict = OrderedDict(
+                (abbrev, im_prop_dict[prop_name])
+                for prop_name, abbrev in schema_items
+                if prop_name in im_prop_dict
+            )
+            if time_abbrev in abbrev_dict:
+                # convert timestamp to date string
+                dt = datetime.fromtimestamp(
+                    abbrev_dict[time_abbrev] / 1000, tz=timezone.utc
+                )
+                abbrev_dict[time_abbrev] = dt.strftime("%Y-%m-%d %H:%M")
             abbrev_props.append(abbrev_dict)
         return tabulate.tabulate(
             abbrev_props, headers="keys", floatfmt=".2f", tablefmt=_table_fmt
@@ -492,6 +571,8 @@ class MaskedCollection:
 
         ee_collection = self._ee_collection.map(prepare_image)
 
+        # the date and no region sort orders are mirrored client side in _sort_properties(), and should be kept in
+        # sync with it
         if method in self._sort_methods:
             if date:
                 ee_collection = ee_collection.sort("DATE_DIST", opt_ascending=False)
@@ -678,13 +759,7 @@ class MaskedCollection:
             Composite image.
         """
 
-        if isinstance(date, str):
-            try:
-                date = datetime.strptime(date, "%Y-%m-%d")
-            except ValueError:
-                raise ValueError(
-                    '`date` should be a datetime instance or a string with format: "%Y-%m-%d"'
-                )
+        date = parse_date(date, "`date`")
 
         if method is None:
             method = (
@@ -693,8 +768,19 @@ class MaskedCollection:
                 else CompositeMethod.q_mosaic
             )
 
-        # mask, sort & resample the EE collection
+        # return a previously created composite with the same parameters, if there is one.  A new MaskedImage is
+        # returned each time, as MaskedImage.mask_clouds() modifies the instance's ee_image.
         method = CompositeMethod(method)
+        cache_key = self._composite_cache_key(
+            method, mask, resampling, date, region, kwargs
+        )
+        if cache_key is not None and cache_key in self._composite_cache:
+            comp_image, comp_id = self._composite_cache[cache_key]
+            gd_comp_image = self.image_type(comp_image)
+            gd_comp_image._id = comp_id
+            return gd_comp_image
+
+        # mask, sort & resample the EE collection
         ee_collection = self._prepare_for_composite(
             method=method,
             mask=mask,
@@ -721,35 +807,50 @@ class MaskedCollection:
             raise ValueError(f"Unsupported composite method: {method}")
 
         # populate composite image metadata with info on component images
-        # TODO: speed this up, e.g. can we use just ID's and times from self.properties?
-        props = self._get_properties(ee_collection)
+        if (self._properties is not None) and not region:
+            # avoid a getInfo() round trip by re-using already retrieved properties (region stats are not changed
+            # without a region), sorted as the prepared collection is sorted
+            props = self._sort_properties(self._properties, method, date=date)
+        else:
+            props = self._get_properties(ee_collection)
         if len(props) == 0:
             raise ValueError("The collection is empty.")
-        props_str = self._get_properties_table(props)
-        comp_image = comp_image.set("INPUT_IMAGES", "TABLE:\n" + props_str)
+        # re-use the cached properties table when the properties are unchanged
+        props_str = (
+            self.properties_table
+            if props is self._properties
+            else self._get_properties_table(props)
+        )
 
-        # construct an ID for the composite
-        dates = [
-            datetime.utcfromtimestamp(item["system:time_start"] / 1000)
-            for item in props.values()
+        # construct an ID for the composite (find the min/max timestamps and convert only those to dates)
+        timestamps = [item["system:time_start"] for item in props.values()]
+        min_date, max_date = [
+            datetime.fromtimestamp(ts / 1000, tz=timezone.utc)
+            for ts in (min(timestamps), max(timestamps))
         ]
-        start_date = min(dates).strftime("%Y_%m_%d")
-        end_date = max(dates).strftime("%Y_%m_%d")
+        start_date = min_date.strftime("%Y_%m_%d")
+        end_date = max_date.strftime("%Y_%m_%d")
 
         method_str = method.value.upper()
         if method in self._sort_methods and date:
             method_str += "-" + date.strftime("%Y_%m_%d")
 
         comp_id = f"{self.name}/{start_date}-{end_date}-{method_str}-COMP"
-        comp_image = comp_image.set("system:id", comp_id)  # sets root 'id' property
-        comp_image = comp_image.set(
-            "system:index", comp_id
-        )  # sets 'properties'->'system:index'
-
-        # set the composite capture time to the capture time of the first input image.
-        # note that we must specify the timezone as utc, otherwise .timestamp() assumes local time.
-        timestamp = min(dates).replace(tzinfo=timezone.utc).timestamp() * 1000
-        comp_image = comp_image.set("system:time_start", timestamp)
+        # set all composite properties with a single (server side) setMulti call, by passing an ee.Dictionary rather
+        # than a python dict (which is set one key at a time): 'system:id' sets the root 'id' property,
+        # 'system:index' sets 'properties'->'system:index', and the capture time is set to the capture time of the
+        # first input image.
+        comp_props = ee.Dictionary(
+            {
+                "INPUT_IMAGES": "TABLE:\n" + props_str,
+                "system:id": comp_id,
+                "system:index": comp_id,
+                "system:time_start": min(timestamps),
+            }
+        )
+        comp_image = comp_image.set(comp_props)
+        if cache_key is not None:
+            self._composite_cache[cache_key] = (comp_image, comp_id)
         gd_comp_image = self.image_type(comp_image)
         gd_comp_image._id = comp_id  # avoid getInfo() for id property
         return gd_comp_image
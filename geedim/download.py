@@ -16,14 +16,16 @@
 
 ##
 import logging
+import math
 import os
 import pathlib
+import queue
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from itertools import product
-from typing import Dict, Iterator, List, Optional, Tuple, Union
+from io import BytesIO
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
 
 import ee
 import numpy as np
@@ -31,15 +33,17 @@ import rasterio as rio
 from rasterio import features, warp, windows
 from rasterio.crs import CRS
 from rasterio.enums import Resampling as RioResampling
-from rich.progress import Progress
 from shapely import Polygon
-from tqdm.auto import tqdm
 
 from geedim import utils
 from geedim.enums import ExportType, ResamplingMethod
 from geedim.stac import StacCatalog, StacItem
 from geedim.tile import Tile
 
+if TYPE_CHECKING:
+    # rich is only needed for type hints here, so is not imported at run time
+    from rich.progress import Progress
+
 logger = logging.getLogger(__name__)
 
 supported_dtypes = [
@@ -64,8 +68,11 @@ class BaseImage:
     _float_nodata = float("nan")
     _desc_width = 50
     _default_resampling = ResamplingMethod.near
-    _ee_max_tile_size = 32
+    _ee_max_tile_size = 48
     _ee_max_tile_dim = 10_000
+    _gtiff_block_size = 512
+    # directory in which to cache image metadata (see utils.get_info()), or None to disable caching
+    _info_cache_dir: Optional[Union[str, pathlib.Path]] = None
     _default_export_type = ExportType.drive
 
     def __init__(self, ee_image: ee.Image):
@@ -86,6 +93,8 @@ class BaseImage:
         self._id = None
         self.__min_projection = None
         self._min_dtype = None
+        self.__stac = None
+        self.__band_properties = None
 
     @classmethod
     def from_id(cls, image_id: str) -> "BaseImage":
@@ -107,11 +116,28 @@ class BaseImage:
         gd_image._id = image_id  # set the id attribute from image_id (avoids a call to getInfo() for .id property)
         return gd_image
 
+    @staticmethod
+    def _get_info_batch(images: List["BaseImage"]):
+        """
+        Retrieve the Earth Engine metadata of the given images, where it has not been retrieved already, with a single
+        ``getInfo()`` call rather than one call per image.
+        """
+        images = [im for im in images if im.__ee_info is None]
+        if len(images) > 1:
+            ee_infos = utils.get_info(
+                ee.List([im.ee_image for im in images]),
+                cache_dir=BaseImage._info_cache_dir,
+            )
+            for im, ee_info in zip(images, ee_infos):
+                im.__ee_info = ee_info
+
     @property
     def _ee_info(self) -> Dict:
         """Earth Engine image metadata."""
         if self.__ee_info is None:
-            self.__ee_info = self._ee_image.getInfo()
+            self.__ee_info = utils.get_info(
+                self._ee_image, cache_dir=BaseImage._info_cache_dir
+            )
         return self.__ee_info
 
     @property
@@ -124,7 +150,11 @@ class BaseImage:
     @property
     def _stac(self) -> Optional[StacItem]:
         """Image STAC info.  None if there is no Earth Engine STAC entry for the image / image's collection."""
-        return StacCatalog().get_item(self.id)
+        # cache the STAC item with the ID it was created for, as the ID can change if ee_image is set
+        image_id = self.id
+        if (self.__stac is None) or (self.__stac[0] != image_id):
+            self.__stac = (image_id, StacCatalog().get_item(image_id))
+        return self.__stac[1]
 
     @property
     def ee_image(self) -> ee.Image:
@@ -136,6 +166,7 @@ class BaseImage:
         self.__ee_info = None
         self.__min_projection = None
         self._min_dtype = None
+        self.__band_properties = None
         self._ee_image = value
 
     @property
@@ -238,7 +269,9 @@ class BaseImage:
     @property
     def band_properties(self) -> List[Dict]:
         """Merged STAC and Earth Engine band properties."""
-        return self._get_band_properties()
+        if self.__band_properties is None:
+            self.__band_properties = self._get_band_properties()
+        return self.__band_properties
 
     @property
     def refl_bands(self) -> Optional[List[str]]:
@@ -280,24 +313,26 @@ class BaseImage:
         """
         projection_info = dict(crs=None, transform=None, shape=None, scale=None)
         if "bands" in ee_info:
-            # get scale & crs corresponding to min/max scale band
-            scales = np.array([abs(bd["crs_transform"][0]) for bd in ee_info["bands"]])
-            crss = np.array([bd["crs"] for bd in ee_info["bands"]])
-            fixed_idx = (crss != "EPSG:4326") | (scales != 1)
-            if sum(fixed_idx) > 0:
-                idx = (
-                    np.argmin(scales[fixed_idx])
-                    if min_scale
-                    else np.argmax(scales[fixed_idx])
-                )
-                band_info = np.array(ee_info["bands"])[fixed_idx][idx]
-                projection_info["scale"] = abs(band_info["crs_transform"][0])
+            # get scale & crs corresponding to min/max scale band (in a single pass over the band dicts with python
+            # builtins, rather than building numpy arrays of the band scales, crss and dicts)
+            def band_scale(band_info: Dict) -> float:
+                return abs(band_info["crs_transform"][0])
+
+            fixed_bands = [
+                bd
+                for bd in ee_info["bands"]
+                if (bd["crs"] != "EPSG:4326") or (band_scale(bd) != 1)
+            ]
+            if len(fixed_bands) > 0:
+                select_band = min if min_scale else max
+                band_info = select_band(fixed_bands, key=band_scale)
+                projection_info["scale"] = band_scale(band_info)
                 projection_info["crs"] = band_info["crs"]
                 if "dimensions" in band_info:
                     projection_info["shape"] = band_info["dimensions"][::-1]
                 projection_info["transform"] = rio.Affine(*band_info["crs_transform"])
-                if ("origin" in band_info) and not np.any(
-                    np.isnan(band_info["origin"])
+                if ("origin" in band_info) and not any(
+                    math.isnan(origin) for origin in band_info["origin"]
                 ):
                     projection_info["transform"] *= rio.Affine.translation(
                         *band_info["origin"]
@@ -323,8 +358,9 @@ class BaseImage:
 
             if len(int_minmax) == 0:
                 return None
-            min_value = np.nanmin(int_minmax)
-            max_value = np.nanmax(int_minmax)
+            # use python builtins on the (short) list of scalars, rather than numpy
+            min_value = min(int_minmax)
+            max_value = max(int_minmax)
 
             for dtype in supported_dtypes[:-2]:
                 if (min_value >= np.iinfo(dtype).min) and (
@@ -337,12 +373,10 @@ class BaseImage:
         #  int64 support should be added when these issues are resolved
         dtype = None
         if "bands" in ee_info:
-            precisions = np.array(
-                [bd["data_type"]["precision"] for bd in ee_info["bands"]]
-            )
-            if any(precisions == "double"):
+            precisions = {bd["data_type"]["precision"] for bd in ee_info["bands"]}
+            if "double" in precisions:
                 dtype = "float64"
-            elif any(precisions == "float"):
+            elif "float" in precisions:
                 # if there are >= 32 integer bits, use float64 to accommodate them, otherwise float32
                 int_dtype = get_min_int_dtype(ee_info["bands"])
                 dtype = (
@@ -387,19 +421,17 @@ class BaseImage:
 
     def _get_band_properties(self) -> List[Dict]:
         """Merge Earth Engine and STAC band properties for this image."""
+        # merge in a single pass over the image bands, with dict lookups of the STAC band properties
         band_ids = [bd["id"] for bd in self._ee_info["bands"]]
-        if self._stac:
-            stac_bands_props = self._stac.band_props
-            band_props = [
-                stac_bands_props[bid] if bid in stac_bands_props else dict(name=bid)
-                for bid in band_ids
-            ]
-        else:  # just use the image band IDs
-            band_props = [dict(name=bid) for bid in band_ids]
-        return band_props
+        stac_bands_props = self._stac.band_props if self._stac else {}
+        return [stac_bands_props.get(bid, dict(name=bid)) for bid in band_ids]
 
     @staticmethod
-    def _scale_offset(ee_image: ee.Image, band_properties: List[Dict]) -> ee.Image:
+    def _scale_offset(
+        ee_image: ee.Image,
+        band_properties: List[Dict],
+        band_names: Optional[List[str]] = None,
+    ) -> ee.Image:
         """
         Apply any STAC band scales and offsets to an EE image.
 
@@ -413,6 +445,9 @@ class BaseImage:
         band_properties: list(dict)
             A list of dictionaries specifying band names and corresponding scale and or offset values e.g.
             :attr:`BaseImage.band_properties`.
+        band_names: list(str), optional
+            Names of the ``ee_image`` bands, if they are known client side.  Used to avoid finding the bands to scale
+            and offset on the server.
 
         Returns
         -------
@@ -434,16 +469,23 @@ class BaseImage:
             for bp in band_properties
         }
 
-        if all([s == 1 for s in scale_dict.values()]) and all(
-            [o == 0 for o in offset_dict.values()]
+        if all(s == 1 for s in scale_dict.values()) and all(
+            o == 0 for o in offset_dict.values()
         ):
             # all scales==1 and all offsets==0
             return ee_image
 
-        adj_bands = ee_image.bandNames().filter(
-            ee.Filter.inList("item", list(scale_dict.keys()))
-        )
-        non_adj_bands = ee_image.bandNames().removeAll(adj_bands)
+        if band_names is not None:
+            # split the bands into adjusted and non-adjusted lists client side
+            adj_bands = [bn for bn in band_names if bn in scale_dict]
+            non_adj_bands = [bn for bn in band_names if bn not in scale_dict]
+            all_bands = band_names
+        else:
+            adj_bands = ee_image.bandNames().filter(
+                ee.Filter.inList("item", list(scale_dict.keys()))
+            )
+            non_adj_bands = ee_image.bandNames().removeAll(adj_bands)
+            all_bands = ee_image.bandNames()
 
         # apply the scales and offsets
         scale_im = ee.Dictionary(scale_dict).toImage().select(adj_bands)
@@ -454,7 +496,7 @@ class BaseImage:
         # are additional image bands in `ee_image` not in `band_properties`. Here, these additional bands are added
         # back to the adjusted image.
         adj_im = adj_im.addBands(ee_image.select(non_adj_bands))
-        adj_im = adj_im.select(ee_image.bandNames())  # keep bands in original order
+        adj_im = adj_im.select(all_bands)  # keep bands in original order
         # copy original ee_image properties and return
         return ee.Image(adj_im.copyProperties(ee_image, ee_image.propertyNames()))
 
@@ -563,7 +605,10 @@ class BaseImage:
         # perform image scale/offset, dtype and resampling operations
         ee_image = exp_image.ee_image
         if scale_offset:
-            ee_image = BaseImage._scale_offset(ee_image, exp_image.band_properties)
+            band_names = [bd["id"] for bd in exp_image._ee_info["bands"]]
+            ee_image = BaseImage._scale_offset(
+                ee_image, exp_image.band_properties, band_names=band_names
+            )
             im_dtype = "float64"
         else:
             im_dtype = exp_image.dtype
@@ -668,14 +713,26 @@ class BaseImage:
             count=exp_image.count,
             crs=CRS.from_string(utils.rio_crs(exp_image.crs)),
             transform=exp_image.transform,
-            compress="deflate",
             interleave="band",
             tiled=True,
             photometric="MINISBLACK",
         )
-        # add BIGTIFF support if the uncompressed image is bigger than 4GB
-        if exp_image.size >= 4e9:
-            profile.update(bigtiff="yes")
+        # Use fast ZSTD compression if supported, otherwise DEFLATE.  Use a floating point predictor (3) for float
+        # data types, and horizontal differencing (2) otherwise.
+        predictor = 3 if exp_image.dtype.startswith("float") else 2
+        if utils.gtiff_zstd_supported():
+            profile.update(compress="zstd", zstd_level=1, predictor=predictor)
+        else:
+            profile.update(compress="deflate", predictor=predictor)
+        # use square blocks of a fixed size that download tiles are aligned to (see _get_tile_shape()), so that
+        # writing a tile does not re-read & re-compress blocks shared with other tiles
+        if min(exp_image.shape) >= BaseImage._gtiff_block_size:
+            profile.update(
+                blockxsize=BaseImage._gtiff_block_size,
+                blockysize=BaseImage._gtiff_block_size,
+            )
+        # let GDAL add BIGTIFF support if the image could be bigger than 4GB
+        profile.update(bigtiff="if_safer")
         return exp_image, profile
 
     def _get_tile_shape(
@@ -705,8 +762,9 @@ class BaseImage:
             max_tile_dim or BaseImage._ee_max_tile_dim
         )  # set max_tile_dim to EE default if None
 
-        # find the total number of tiles the image must be divided into to satisfy max_tile_size
-        image_shape = np.array(self.shape, dtype="int64")
+        # find the total number of tiles the image must be divided into to satisfy max_tile_size (using python ints
+        # rather than numpy arrays, as the loop runs once per tile division)
+        image_shape = tuple(self.shape)
         dtype_size = np.dtype(self.dtype).itemsize
         image_size = self.size
         if self.dtype.endswith("int8"):
@@ -716,20 +774,29 @@ class BaseImage:
 
         pixel_size = dtype_size * self.count
 
-        num_tile_shape = np.array([1, 1], dtype="int64")
+        num_tile_shape = [1, 1]
         tile_size = image_size
-        tile_shape = image_shape
+        tile_shape = list(image_shape)
         while tile_size >= max_tile_size:
-            div_axis = np.argmax(tile_shape)
-            num_tile_shape[
-                div_axis
-            ] += 1  # increase the num tiles down the longest dimension of tile_shape
-            tile_shape = np.ceil(image_shape / num_tile_shape).astype("int64")
+            # increase the num tiles down the longest dimension of tile_shape
+            div_axis = 0 if tile_shape[0] >= tile_shape[1] else 1
+            num_tile_shape[div_axis] += 1
+            tile_shape = [
+                -(-dim // num) for dim, num in zip(image_shape, num_tile_shape)
+            ]
             tile_size = tile_shape[0] * tile_shape[1] * pixel_size
 
-        tile_shape[tile_shape > max_tile_dim] = max_tile_dim
-        num_tiles = int(np.product(np.ceil(image_shape / tile_shape)))
-        tile_shape = tuple(tile_shape.tolist())
+        # where the image is split along a dimension, round the tile dimension down to a multiple of the GeoTIFF
+        # block size, so that tiles are aligned with blocks in the downloaded GeoTIFF
+        block_size = BaseImage._gtiff_block_size
+        tile_shape = [min(dim, max_tile_dim) for dim in tile_shape]
+        tile_shape = tuple(
+            (tdim // block_size) * block_size if block_size < tdim < dim else tdim
+            for dim, tdim in zip(image_shape, tile_shape)
+        )
+        num_tiles = math.prod(
+            -(-dim // tdim) for dim, tdim in zip(image_shape, tile_shape)
+        )
         return tile_shape, num_tiles
 
     def _build_overviews(
@@ -743,7 +810,10 @@ class BaseImage:
         # TODO: revisit multi-threaded overviews on gdal update
         # build overviews in a single threaded environment (currently gdal reports errors when building overviews
         # with GDAL_NUM_THREADS='ALL_CPUs' - see https://github.com/OSGeo/gdal/issues/7921)
-        env_dict = dict(GTIFF_FORCE_RGBA=False, COMPRESS_OVERVIEW="DEFLATE")
+        env_dict = dict(
+            GTIFF_FORCE_RGBA=False,
+            COMPRESS_OVERVIEW="ZSTD" if utils.gtiff_zstd_supported() else "DEFLATE",
+        )
         if self.size >= 4e9:
             env_dict.update(BIGTIFF_OVERVIEW=True)
 
@@ -791,7 +861,9 @@ class BaseImage:
                 dataset.set_band_description(band_i + 1, clean_band_dict["name"])
             dataset.update_tags(band_i + 1, **clean_band_dict)
 
-    def _tiles(self, tile_shape: Tuple[int, int]) -> Iterator[Tile]:
+    def _tiles(
+        self, tile_shape: Tuple[int, int], image_key: Optional[str] = None
+    ) -> Iterator[Tile]:
         """
         Iterator over downloadable image tiles.
 
@@ -804,6 +876,9 @@ class BaseImage:
         tile_shape: Tuple[int, int]
             (row, column) tile shape to use (pixels). Use :meth:`BaseImage._get_tile_shape` to find a tile shape that
             satisfies the Earth Engine download limit for :param:`exp_image`.
+        image_key: str, optional
+            Hash of the serialised image, shared between tiles to key the tile download cache.  See
+            :meth:`Tile.image_key`.
 
         Yields
         -------
@@ -813,21 +888,19 @@ class BaseImage:
 
         # split the image up into tiles of at most `tile_shape` dimension
         image_shape = self.shape
-        start_range = product(
-            range(0, image_shape[0], tile_shape[0]),
-            range(0, image_shape[1], tile_shape[1]),
-        )
-        for tile_start in start_range:
-            tile_stop = np.clip(
-                np.add(tile_start, tile_shape), a_min=None, a_max=image_shape
-            )
-            clip_tile_shape = (
-                tile_stop - tile_start
-            ).tolist()  # tolist is just to convert to native int
-            tile_window = windows.Window(
-                tile_start[1], tile_start[0], clip_tile_shape[1], clip_tile_shape[0]
-            )
-            yield Tile(self, tile_window)
+        # resolve the CRS and transform once, and share them between tiles
+        crs, transform = self.crs, self.transform
+        # (the tile windows are found with python ints, rather than small numpy arrays, to reduce the per-tile cost)
+        for row_start in range(0, image_shape[0], tile_shape[0]):
+            tile_height = min(tile_shape[0], image_shape[0] - row_start)
+            for col_start in range(0, image_shape[1], tile_shape[1]):
+                tile_width = min(tile_shape[1], image_shape[1] - col_start)
+                tile_window = windows.Window(
+                    col_start, row_start, tile_width, tile_height
+                )
+                yield Tile(
+                    self, tile_window, crs=crs, transform=transform, image_key=image_key
+                )
 
     @staticmethod
     def monitor_export(task: ee.batch.Task, label: str = None):
@@ -862,7 +935,10 @@ class BaseImage:
                 elif status["metadata"]["state"] == "FAILED":
                     raise IOError(f"Export failed \n{status}")
 
-        # wait for export to complete, displaying a progress bar
+        # wait for export to complete, displaying a progress bar (tqdm is imported here, rather than at module level,
+        # so that importing geedim does not pay its import time)
+        from tqdm.auto import tqdm
+
         bar_format = "{desc}: |{bar}| [{percentage:5.1f}%] in {elapsed:>5s} (eta: {remaining:>5s})"
         with tqdm(
             desc=f"Exporting {label}",
@@ -999,7 +1075,8 @@ class BaseImage:
         num_threads: Optional[int] = None,
         max_tile_size: Optional[float] = None,
         max_tile_dim: Optional[int] = None,
-        progress: Optional[Progress] = None,
+        progress: Optional["Progress"] = None,
+        cache_dir: Optional[Union[pathlib.Path, str]] = None,
         **kwargs,
     ):
         """
@@ -1024,11 +1101,17 @@ class BaseImage:
         overwrite : bool, optional
             Overwrite the destination file if it exists.
         num_threads: int, optional
-            Number of tiles to download concurrently.  Defaults to a sensible auto value.
+            Number of tiles to download concurrently.  Defaults to 4 times the number of CPUs, up to a maximum of 32.
+            Tiles are decoded concurrently with a separate pool of threads, one per CPU.
         max_tile_size: int, optional
-            Maximum tile size (MB).  If None, defaults to the Earth Engine download size limit (32 MB).
+            Maximum tile size (MB).  If None, defaults to the Earth Engine download size limit (48 MB).
         max_tile_dim: int, optional
             Maximum tile width/height (pixels).  If None, defaults to Earth Engine download limit (10000).
+        cache_dir: pathlib.Path, str, optional
+            Directory in which to cache downloaded tiles.  Tiles are cached by image, CRS, transform and shape, so
+            that repeating a download reads unchanged tiles from the cache, rather than downloading them.  Cached
+            tiles older than 7 days are deleted when a download starts, but the cache size is not limited.  If None
+            (the default), tiles are not cached.
         crs : str, optional
             WKT or EPSG specification of CRS to export to.  Where image bands have different CRSs, all are
             re-projected to this CRS. Defaults to use the CRS of the minimum scale band if available.
@@ -1057,25 +1140,40 @@ class BaseImage:
             A rich Progress object to display download progress. If None, no progress bar is shown.
         """
 
-        max_threads = num_threads or min(10, (os.cpu_count() or 1) + 4)
-        logger.debug(f"Using {max_threads} threads for download.")
-        out_lock = threading.Lock()
+        # tile downloads are bound by Earth Engine request latency rather than CPU, so the download thread count is
+        # decoupled from (and larger than) the CPU bound decode thread count
+        max_threads = num_threads or min(32, 4 * (os.cpu_count() or 1))
+        num_decode_threads = os.cpu_count() or 1
+        logger.debug(
+            f"Using {max_threads} threads for download, and {num_decode_threads} for decoding."
+        )
         filename = pathlib.Path(filename)
         if filename.exists():
             if overwrite:
                 os.remove(filename)
             else:
                 raise FileExistsError(f"{filename} exists")
-
-        # prepare (resample, convert, reproject) the image for download
-        exp_image, profile = self._prepare_for_download(**kwargs)
+        if cache_dir is not None:
+            # remove stale tiles so that the cache does not grow indefinitely
+            utils.prune_cache(cache_dir, "tile_*.tif", Tile._cache_max_age)
+
+        # Retrieve the STAC item (used for band properties and file metadata) in a background thread, so that its
+        # network requests overlap with the Earth Engine metadata requests made when preparing the image.  The image
+        # ID is resolved, and the STAC item cached, on this thread so that only the catalog request runs in the
+        # background.
+        image_id = self.id
+        with ThreadPoolExecutor(max_workers=1) as stac_executor:
+            stac_future = stac_executor.submit(StacCatalog().get_item, image_id)
+            # prepare (resample, convert, reproject) the image for download
+            exp_image, profile = self._prepare_for_download(**kwargs)
+            self.__stac = (image_id, stac_future.result())
 
         # get the dimensions of an image tile that will satisfy GEE download limits
         tile_shape, num_tiles = exp_image._get_tile_shape(
             max_tile_size=max_tile_size, max_tile_dim=max_tile_dim
         )
 
-        # find raw size of the download data (less than the actual download size as the image data is zipped in a
+        # find raw size of the download data (less than the actual download size as the image data is in a
         # compressed geotiff)
         raw_download_size = exp_image.size
         if logger.getEffectiveLevel() <= logging.DEBUG:
@@ -1096,7 +1194,9 @@ class BaseImage:
                 f" download size (raw: {BaseImage._str_format_size(raw_download_size)})."
             )
 
-        session = utils.retry_session(5)
+        # share a session between download threads, with a connection pool sized to the number of threads, and a
+        # backoff that gives Earth Engine rate limiting (HTTP 429) time to clear
+        session = utils.retry_session(5, backoff_factor=1.0, pool_maxsize=max_threads)
 
         task = None
         if progress is not None:
@@ -1110,16 +1210,64 @@ class BaseImage:
             rio.open(filename, "w", **profile) as out_ds,
         ):
 
-            def download_tile(tile: Tile):
-                """Download a tile and write into the destination GeoTIFF."""
-                tile_array = tile.download(session=session, num_threads=max_threads)
-                with out_lock:
-                    out_ds.write(tile_array, window=tile.window)
+            # Decoded tiles are written to the destination GeoTIFF by a single writer thread, that consumes a queue
+            # of (array, window) items.  Decode threads then don't contend for write access to the GeoTIFF.
+            write_queue = queue.Queue(maxsize=2 * num_decode_threads)
+            write_errors = []
+
+            def write_tiles():
+                """Write queued tiles into the destination GeoTIFF until a ``None`` sentinel is received."""
+                while True:
+                    item = write_queue.get()
+                    if item is None:
+                        break
+                    if write_errors:
+                        # keep consuming the queue after an error so that decode threads don't block on a full queue
+                        continue
+                    try:
+                        out_ds.write(item[0], window=item[1])
+                    except Exception as ex:
+                        write_errors.append(ex)
+
+            def stop_writer():
+                """Wait for the writer thread to write all queued tiles and exit."""
+                if writer.is_alive():
+                    write_queue.put(None)
+                    writer.join()
+
+            # set on error or interrupt, so that queued tiles are not downloaded or decoded
+            cancel = threading.Event()
+
+            def download_tile(tile: Tile) -> Optional[BytesIO]:
+                """Download a tile into a buffer."""
+                if cancel.is_set():
+                    return None
+                return tile._download_buffer(
+                    session=session, num_threads=max_threads, cache_dir=cache_dir
+                )
 
-            with ThreadPoolExecutor(max_workers=max_threads) as executor:
-                # Run the tile downloads in a thread pool
-                tiles = exp_image._tiles(tile_shape=tile_shape)
-                futures = []
+            def decode_tile(tile: Tile, buffer: BytesIO):
+                """Decode a downloaded tile and queue it for writing."""
+                if cancel.is_set():
+                    return
+                write_queue.put((tile._read_buffer(buffer), tile.window))
+
+            writer = threading.Thread(target=write_tiles, daemon=True)
+            writer.start()
+
+            # Run the tile downloads (network I/O bound) and tile decoding (CPU bound) in separate thread pools so
+            # that downloading is not held up by decoding.
+            with (
+                ThreadPoolExecutor(max_workers=max_threads) as executor,
+                ThreadPoolExecutor(max_workers=num_decode_threads) as decode_executor,
+            ):
+                # serialise the image once for the tile cache keys, rather than once per tile
+                image_key = (
+                    Tile.image_key(exp_image.ee_image)
+                    if cache_dir is not None
+                    else None
+                )
+                tiles = exp_image._tiles(tile_shape=tile_shape, image_key=image_key)
                 if (
                     "coordinates" in self.footprint
                     and len(self.footprint["coordinates"]) > 0
@@ -1135,47 +1283,99 @@ class BaseImage:
                     )
                 else:
                     im_bounds = None
-                keep_count, skip_count = 0, 0
-                for tile in tiles:
-                    tile_bounds = utils.bounds_to_polygon(
-                        *rio.windows.bounds(tile.window, exp_image.transform)
-                    )
-                    if im_bounds is None or tile_bounds.intersects(im_bounds):
-                        futures.append(executor.submit(download_tile, tile))
-                        keep_count += 1
-                    else:
+
+                def next_tile() -> Optional[Tile]:
+                    """Return the next tile that intersects the image footprint, or None if there are no more tiles."""
+                    nonlocal skip_count
+                    for tile in tiles:
+                        tile_bounds = utils.bounds_to_polygon(
+                            *rio.windows.bounds(tile.window, exp_image.transform)
+                        )
+                        if im_bounds is None or tile_bounds.intersects(im_bounds):
+                            return tile
                         skip_count += 1
-                logger.debug(f"Skipped {skip_count} windows, kept {keep_count}.")
+                    return None
+
+                def cancel_download():
+                    """Cancel queued tiles, wait for running tiles and the writer, then remove the file."""
+                    cancel.set()
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    decode_executor.shutdown(wait=True, cancel_futures=True)
+                    stop_writer()
+                    if filename.exists():
+                        filename.unlink()
+
+                # limit the number of download & decode futures in flight, so that tiles and their futures are
+                # created as earlier ones complete, rather than all at once
+                max_pending = 2 * max_threads
+                keep_count, skip_count = 0, 0
+                tiles_remain = True
                 try:
+                    # submit tile downloads and wait on download and decode futures.  Decodes are submitted from this
+                    # thread as downloads complete, and a tile is finished when its decode completes.
+                    downloads: Dict[Future, Tile] = {}
+                    decodes = set()
+                    n_finished = 0
+                    while True:
+                        while (
+                            tiles_remain
+                            and len(downloads) + len(decodes) < max_pending
+                        ):
+                            tile = next_tile()
+                            if tile is None:
+                                tiles_remain = False
+                                logger.debug(
+                                    f"Skipped {skip_count} windows, kept {keep_count}."
+                                )
+                            else:
+                                future = executor.submit(download_tile, tile)
+                                downloads[future] = tile
+                                keep_count += 1
+                        if not downloads and not decodes:
+                            break
+
+                        done, _ = wait(
+                            [*downloads, *decodes], return_when=FIRST_COMPLETED
+                        )
+                        if write_errors:
+                            raise write_errors[0]
+                        for future in done:
+                            if future in downloads:
+                                tile = downloads.pop(future)
+                                decodes.add(
+                                    decode_executor.submit(
+                                        decode_tile, tile, future.result()
+                                    )
+                                )
+                                continue
+
+                            decodes.remove(future)
+                            future.result()
+                            n_finished += 1
+                            if progress is not None:
+                                total = (
+                                    num_tiles - skip_count if tiles_remain else keep_count
+                                )
+                                progress.update(task, completed=n_finished, total=total)
+                                progress.refresh()
+                    stop_writer()
+                    if write_errors:
+                        raise write_errors[0]
                     if progress is not None:
-                        for completed_future in as_completed(futures):
-                            n_finished = sum([future.done() for future in futures])
-                            progress.update(
-                                task, completed=n_finished, total=len(futures)
-                            )
-                            progress.refresh()
-                            completed_future.result()
                         progress.update(task, visible=False)
-                    else:
-                        for completed_future in as_completed(futures):
-                            completed_future.result()
                 except KeyboardInterrupt:
                     logger.error(
                         "Keyboard interrupt while downloading. "
                         "[red]Please wait[/] while current downloads finish (this may take up to a few minutes)."
                     )
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    if filename.exists():
-                        filename.unlink()
-                    executor.shutdown(wait=True, cancel_futures=True)
+                    cancel_download()
                     raise
                 except Exception as ex:
                     logger.info(f"Exception: {str(ex)}\nCancelling...")
-                    executor.shutdown(wait=False, cancel_futures=True)
-                    if filename.exists():
-                        filename.unlink()
-                    executor.shutdown(wait=True, cancel_futures=True)
+                    cancel_download()
                     raise ex
+                finally:
+                    stop_writer()
 
             # populate GeoTIFF metadata
             exp_image._write_metadata(out_ds)
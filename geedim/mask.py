@@ -13,6 +13,7 @@
     See the License for the specific language governing permissions and
     limitations under the License.
 """
+import functools
 import logging
 from typing import Dict
 
@@ -189,10 +190,12 @@ class MaskedImage(BaseImage):
             .multiply(100)
         )
 
-        # set the encapsulated image properties
-        self.ee_image = self.ee_image.set("FILL_PORTION", fill_portion)
-        # set CLOUDLESS_PORTION=100 for the generic case, where cloud/shadow masking is not supported
-        self.ee_image = self.ee_image.set("CLOUDLESS_PORTION", 100.0)
+        # set the encapsulated image properties (CLOUDLESS_PORTION=100 for the generic case, where cloud/shadow
+        # masking is not supported)
+        region_stats = ee.Dictionary(
+            dict(FILL_PORTION=fill_portion, CLOUDLESS_PORTION=100.0)
+        )
+        self.ee_image = self.ee_image.set(region_stats)
 
     def mask_clouds(self):
         """Apply the cloud/shadow mask if supported, otherwise apply the fill mask."""
@@ -203,14 +206,20 @@ class CloudMaskedImage(MaskedImage):
     """A base class for encapsulating cloud/shadow masked images."""
 
     def _cloud_dist(
-        self, cloudless_mask: ee.Image = None, max_cloud_dist: float = 5000
+        self,
+        cloudless_mask: ee.Image = None,
+        max_cloud_dist: float = 5000,
+        proj: ee.Projection = None,
     ) -> ee.Image:
-        """Find the cloud/shadow distance in units of 10m."""
+        """
+        Find the cloud/shadow distance in units of 10m.  ``proj`` is the maximum scale projection of the encapsulated
+        image, and is found if it is not specified.
+        """
         if not cloudless_mask:
             cloudless_mask = self.ee_image.select("CLOUDLESS_MASK")
-        proj = get_projection(
-            self.ee_image, min_scale=False
-        )  # use maximum scale projection to save processing time
+        if not proj:
+            # use maximum scale projection to save processing time
+            proj = get_projection(self.ee_image, min_scale=False)
 
         # Note that initial *MASK bands before any call to mask_clouds(), are themselves masked, so this cloud/shadow
         # mask excludes (i.e. masks) already masked pixels.  This avoids finding distance to e.g. scanline errors in
@@ -234,10 +243,8 @@ class CloudMaskedImage(MaskedImage):
             "CLOUD_DIST"
         )
 
-        # Clip cloud_dist to max_cloud_dist.
-        cloud_dist = cloud_dist.where(
-            cloud_dist.gt(ee.Image(max_cloud_dist / 10)), max_cloud_dist / 10
-        )
+        # Clip cloud_dist to max_cloud_dist (with a single min() rather than a gt() & where() pair).
+        cloud_dist = cloud_dist.min(max_cloud_dist / 10)
 
         # cloud_dist is float64 by default, so convert to Uint16 here to avoid forcing the whole image to float64 on
         # download.
@@ -328,6 +335,12 @@ class LandsatImage(CloudMaskedImage):
     * LANDSAT/LC09/C02/T1_L2
     """
 
+    # QA_PIXEL bit masks
+    _qa_fill_bits = 0b1
+    _qa_cirrus_cloud_bits = 0b1100
+    _qa_cloud_bits = 0b1000
+    _qa_shadow_bits = 0b10000
+
     def _aux_image(
         self,
         mask_shadows: bool = True,
@@ -357,22 +370,29 @@ class LandsatImage(CloudMaskedImage):
 
         # construct fill mask from Earth Engine mask and QA_PIXEL
         ee_mask = ee_image.select("SR_B.*").mask().reduce(ee.Reducer.allNonZero())
-        fill_mask = qa_pixel.bitwiseAnd(1).eq(0).And(ee_mask).rename("FILL_MASK")
+        fill_mask = (
+            qa_pixel.bitwiseAnd(self._qa_fill_bits)
+            .eq(0)
+            .And(ee_mask)
+            .rename("FILL_MASK")
+        )
 
-        shadow_mask = qa_pixel.bitwiseAnd(0b10000).neq(0).rename("SHADOW_MASK")
-        if mask_cirrus:
-            cloud_mask = qa_pixel.bitwiseAnd(0b1100).neq(0).rename("CLOUD_MASK")
-        else:
-            cloud_mask = qa_pixel.bitwiseAnd(0b1000).neq(0).rename("CLOUD_MASK")
+        shadow_mask = (
+            qa_pixel.bitwiseAnd(self._qa_shadow_bits).neq(0).rename("SHADOW_MASK")
+        )
+        cloud_bits = self._qa_cirrus_cloud_bits if mask_cirrus else self._qa_cloud_bits
+        cloud_mask = qa_pixel.bitwiseAnd(cloud_bits).neq(0).rename("CLOUD_MASK")
 
         # combine cloud, shadow and fill masks into cloudless mask
         cloud_shadow_mask = (cloud_mask.Or(shadow_mask)) if mask_shadows else cloud_mask
         cloudless_mask = cloud_shadow_mask.Not().And(fill_mask).rename("CLOUDLESS_MASK")
 
         # copy cloud distance from existing ST_CDIST band (in 10m units), and clip to max_cloud_dist
-        cloud_dist = ee_image.select("ST_CDIST").rename("CLOUD_DIST").toUint16()
-        cloud_dist = cloud_dist.where(
-            cloud_dist.gt(ee.Image(max_cloud_dist / 10)), max_cloud_dist / 10
+        cloud_dist = (
+            ee_image.select("ST_CDIST")
+            .min(max_cloud_dist / 10)
+            .toUint16()
+            .rename("CLOUD_DIST")
         )
 
         return ee.Image(
@@ -383,6 +403,10 @@ class LandsatImage(CloudMaskedImage):
 class Sentinel2ClImage(CloudMaskedImage):
     """Base class for cloud/shadow masking of Sentinel-2 TOA and SR images."""
 
+    # QA60 bit masks
+    _qa_cloud_bits = 1 << 10
+    _qa_cirrus_bits = 1 << 11
+
     def _aux_image(
         self,
         s2_toa: bool = False,
@@ -456,9 +480,10 @@ class Sentinel2ClImage(CloudMaskedImage):
                 cloud_mask = cloud_prob.gte(prob)
             else:
                 qa = ee_im.select("QA60")
-                cloud_mask = qa.bitwiseAnd(1 << 10).neq(0)
+                cloud_bits = self._qa_cloud_bits
                 if mask_cirrus:
-                    cloud_mask = cloud_mask.Or(qa.bitwiseAnd(1 << 11).neq(0))
+                    cloud_bits |= self._qa_cirrus_bits
+                cloud_mask = qa.bitwiseAnd(cloud_bits).neq(0)
             return cloud_mask.rename("CLOUD_MASK")
 
         def get_cdi_cloud_mask(ee_im):
@@ -479,13 +504,12 @@ class Sentinel2ClImage(CloudMaskedImage):
             cdi_image = ee.Algorithms.Sentinel2.CDI(s2_toa_image)
             return cdi_image.lt(cdi_thresh).rename("CDI_CLOUD_MASK")
 
-        def get_shadow_mask(ee_im, cloud_mask):
-            """Given a cloud mask, get a shadow mask for ee_im."""
+        def get_shadow_mask(ee_im, cloud_mask, proj):
+            """Given a cloud mask and the maximum scale projection of ee_im, get a shadow mask for ee_im."""
             dark_mask = ee_im.select("B8").lt(dark * 1e4)
             if not s2_toa:
                 dark_mask = ee_im.select("SCL").neq(6).And(dark_mask)
 
-            proj = get_projection(ee_im, min_scale=False)
             # Note:
             # S2 MEAN_SOLAR_AZIMUTH_ANGLE (SAA) appears to be measured clockwise with 0 at N (i.e. shadow goes in the
             # opposite direction), directionalDistanceTransform() angle appears to be measured clockwise with 0 at W.
@@ -510,6 +534,8 @@ class Sentinel2ClImage(CloudMaskedImage):
 
         # gather and combine the various masks
         ee_image = self.ee_image
+        # find the maximum scale projection once, for use in the shadow mask & cloud distance
+        proj = get_projection(ee_image, min_scale=False)
         cloud_prob = (
             get_cloud_prob(ee_image)
             if mask_method == CloudMaskMethod.cloud_prob
@@ -519,7 +545,7 @@ class Sentinel2ClImage(CloudMaskedImage):
         if cdi_thresh is not None:
             cloud_mask = cloud_mask.And(get_cdi_cloud_mask(ee_image))
         if mask_shadows:
-            shadow_mask = get_shadow_mask(ee_image, cloud_mask)
+            shadow_mask = get_shadow_mask(ee_image, cloud_mask, proj)
             cloud_shadow_mask = cloud_mask.Or(shadow_mask)
         else:
             cloud_shadow_mask = cloud_mask
@@ -546,7 +572,7 @@ class Sentinel2ClImage(CloudMaskedImage):
             aux_bands.append(cloud_prob)
 
         cloud_dist = self._cloud_dist(
-            cloudless_mask=cloudless_mask, max_cloud_dist=max_cloud_dist
+            cloudless_mask=cloudless_mask, max_cloud_dist=max_cloud_dist, proj=proj
         )
         return ee.Image(aux_bands + [cloud_dist])
 
@@ -565,12 +591,10 @@ class Sentinel2ToaClImage(Sentinel2ClImage):
         return Sentinel2ClImage._aux_image(self, s2_toa=True, **kwargs)
 
 
+@functools.lru_cache(maxsize=4096)
 def class_from_id(image_id: str) -> type:
     """Return the *Image class that corresponds to the provided Earth Engine image/collection ID."""
-    ee_coll_name, _ = split_id(image_id)
-    if image_id in geedim.schema.collection_schema:
-        return geedim.schema.collection_schema[image_id]["image_type"]
-    elif ee_coll_name in geedim.schema.collection_schema:
-        return geedim.schema.collection_schema[ee_coll_name]["image_type"]
-    else:
-        return MaskedImage
+    # look up the ID as a collection ID first, and only split it into collection and index if that fails
+    coll_schema = geedim.schema.collection_schema
+    image_schema = coll_schema.get(image_id) or coll_schema.get(split_id(image_id)[0])
+    return image_schema["image_type"] if image_schema else MaskedImage
@@ -46,10 +46,8 @@ def sum_distance(
     # and using ImageCollection.sum() to sum distances, omitting masked areas from the sum.
     # The sum is only masked where all component distances are masked i.e. where ``image`` is masked.
 
-    def accum_dist_to_image(to_image: ee.Image, dist_list: ee.List) -> ee.Image:
-        """
-        Earth engine iterator function to create a list of spectral distances between ``image`` and ``to_image``.
-        """
+    def dist_to_image(to_image: ee.Image) -> ee.Image:
+        """Earth engine mapping function to find the spectral distance between ``image`` and ``to_image``."""
         to_image = ee.Image(to_image).select(bands)
 
         # Find the distance between image and to_image.  Both images are not unmasked so that distance will be
@@ -58,13 +56,13 @@ def sum_distance(
         if metric == SpectralDistanceMetric.sed:
             # sqrt scaling is necessary for summing with other distances and equivalence to original method
             dist = dist.sqrt()
+        return dist
 
-        # Append distance to list.
-        return ee.List(dist_list).add(dist)
-
-    dist_list = ee.List(collection.iterate(accum_dist_to_image, ee.List([])))
+    # Map rather than iterate over the collection to create the distance collection, so that distances are not
+    # accumulated sequentially in an ee.List.
+    dist_coll = collection.map(dist_to_image)
     # TODO: are we better off using mean here to avoid overflow?
-    return ee.ImageCollection(dist_list).sum()
+    return dist_coll.sum()
 
 
 def medoid_score(
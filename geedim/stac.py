@@ -14,19 +14,43 @@
     limitations under the License.
 """
 
+import hashlib
 import json
 import logging
+import pathlib
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict, Union
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Optional, Union
+
+import requests
 
 from geedim import utils
 
+try:
+    # orjson is an optional, faster drop-in for json decoding
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 root_stac_url = "https://earthengine-stac.storage.googleapis.com/catalog/catalog.json"
 
 
 class StacItem:
+    # the EE band properties we want to copy, mapped to their names with 'gee:' stripped
+    _band_prop_keys = {
+        "name": "name",
+        "description": "description",
+        "center_wavelength": "center_wavelength",
+        "gee:wavelength": "wavelength",
+        "gee:units": "units",
+        "gee:scale": "scale",
+        "gee:offset": "offset",
+    }
+
     def __init__(self, name: str, item_dict: Dict):
         """
         Image/collection STAC container class.  Provides access to band properties and root property descriptions.
@@ -40,7 +64,8 @@ class StacItem:
         """
         self._name = name
         self._item_dict = item_dict
-        self._descriptions = self._get_descriptions(item_dict)
+        # property descriptions are only needed for properties tables, so they are parsed on first access
+        self._descriptions = None
         self._band_props = self._get_band_props(item_dict)
 
     def _get_descriptions(self, item_dict: Dict) -> Union[Dict[str, str], None]:
@@ -68,32 +93,18 @@ class StacItem:
         ee_band_props = summaries["eo:bands"]
         # if the gsd is the same across all bands, there is a `gsd` key in summaries, otherwise there are `gsd` keys
         # for each item in ee_band_props
-        global_gsd = summaries["gsd"] if "gsd" in summaries else None
+        global_gsd = summaries.get("gsd", None)
         band_props = {}
-        # a list of the EE band properties we want to copy
-        prop_keys = [
-            "name",
-            "description",
-            "center_wavelength",
-            "gee:wavelength",
-            "gee:units",
-            "gee:scale",
-            "gee:offset",
-        ]
-
-        def strip_gee(key: str):
-            """Remove 'gee:' from the start of `key` if it is there."""
-            return key[4:] if key.startswith("gee:") else key
-
         for ee_band_dict in ee_band_props:
             band_dict = {
-                strip_gee(prop_key): ee_band_dict[prop_key]
-                for prop_key in prop_keys
-                if prop_key in ee_band_dict
-            }  # yapf: disable
-            gsd = ee_band_dict["gsd"] if "gsd" in ee_band_dict else global_gsd
+                prop_key: ee_band_dict[ee_prop_key]
+                for ee_prop_key, prop_key in self._band_prop_keys.items()
+                if ee_prop_key in ee_band_dict
+            }
+            gsd = ee_band_dict.get("gsd", global_gsd)
             gsd = gsd[0] if isinstance(gsd, (list, tuple)) else gsd
-            band_dict.update(gsd=gsd) if gsd else None
+            if gsd:
+                band_dict["gsd"] = gsd
             band_props[ee_band_dict["name"]] = band_dict
         return band_props
 
@@ -105,6 +116,8 @@ class StacItem:
     @property
     def descriptions(self) -> Union[Dict[str, str], None]:
         """Dictionary of property descriptions with property names as keys, and descriptions as values."""
+        if self._descriptions is None:
+            self._descriptions = self._get_descriptions(self._item_dict)
         return self._descriptions
 
     @property
@@ -126,57 +139,103 @@ class StacItem:
 
 @utils.singleton
 class StacCatalog:
+    # STAC 'gee:type' values of image / image collection leaf nodes
+    _image_types = frozenset(("image_collection", "image"))
+    # maximum number of concurrent STAC requests (and pooled connections) when traversing the tree
+    _max_threads = 32
+    # maximum number of item dicts / containers in the memory caches
+    _cache_maxsize = 512
+    # maximum age (s) of item dicts in the disk cache
+    _cache_max_age = 7 * 24 * 60 * 60
+
     def __init__(self):
         """Singleton class to interface to the EE STAC, and retrieve image/collection STAC data."""
         self._filename = utils.root_path.joinpath("geedim/data/ee_stac_urls.json")
-        self._session = utils.retry_session()
+        # keep a connection alive per traversal thread, so that concurrent requests re-use connections to the
+        # (single) STAC host rather than opening new ones
+        self._session = utils.retry_session(pool_maxsize=self._max_threads)
         self._url_dict = None
-        self._cache = {}
+        self._cache = OrderedDict()
+        self._item_cache = OrderedDict()
+        # futures of get_item() requests in progress, so that concurrent requests for the same item are not repeated
+        self._pending_items: Dict[str, Future] = {}
+        # the caches are shared between threads (e.g. prefetch and download threads), and are only accessed with
+        # this lock held
         self._lock = threading.Lock()
+        self._prefetch_executor = None
+        # optional directory in which to cache item dicts across sessions
+        self._cache_dir: Optional[Union[str, pathlib.Path]] = None
 
     @property
     def url_dict(self) -> Dict[str, str]:
         """Dictionary with image/collection IDs/names as keys, and STAC URLs as values."""
         if not self._url_dict:
             # delay reading the json file until it is needed.
-            with open(self._filename, "r") as f:
-                self._url_dict = json.load(f)
+            with open(self._filename, "rb") as f:
+                self._url_dict = _json_loads(f.read())
         return self._url_dict
 
-    def _traverse_stac(self, url: str, url_dict: Dict) -> Dict:
+    def _get_stac_dict(self, url: str) -> Union[Dict, None]:
         """
-        Recursive & threaded EE STAC tree traversal that returns the `url_dict` i.e. a dict with image/collection
-        IDs/names as keys, and the corresponding json STAC URLs as values.
+        Return the STAC dict for the given URL, or None if it could not be read.  If ``_cache_dir`` is set, the dict
+        is cached on disk with its ETag, and only downloaded again if it has changed.
         """
-        response = self._session.get(url)
+        cache_file = etag = cached = None
+        if self._cache_dir is not None:
+            key = hashlib.sha1(url.encode()).hexdigest()
+            cache_file = pathlib.Path(self._cache_dir).joinpath(f"etag_{key}.json")
+            if cache_file.exists():
+                cached = json.loads(cache_file.read_text())
+                etag = cached["etag"]
+
+        headers = {"If-None-Match": etag} if etag else None
+        response = self._session.get(url, headers=headers)
+        if response.status_code == 304:
+            # the node is unchanged since it was cached
+            return cached["stac_dict"]
         if not response.ok:
             logger.warning(f"Error reading {url}: " + str(response.content))
-            return url_dict
-        response_dict = response.json()
-        if "type" in response_dict:
-            if response_dict["type"].lower() == "collection":
-                # we have reached a leaf node
-                if ("gee:type" in response_dict) and (
-                    response_dict["gee:type"].lower() in ["image_collection", "image"]
-                ):
-                    # we have reached an image / image collection leaf node
-                    with self._lock:
-                        url_dict[response_dict["id"]] = url
-                        logger.debug(
-                            f'ID: {response_dict["id"]}, Type: {response_dict["gee:type"]}, URL: {url}'
-                        )
-                return url_dict
-
-            with ThreadPoolExecutor() as executor:
-                # traverse the sub-tree links in a thread pool
-                futures = []
-                for link in response_dict["links"]:
-                    if link["rel"].lower() == "child":
-                        futures.append(
-                            executor.submit(self._traverse_stac, link["href"], url_dict)
-                        )
-                for future in as_completed(futures):
-                    url_dict = future.result()
+            return None
+
+        stac_dict = _json_loads(response.content)
+        if cache_file and "ETag" in response.headers:
+            utils.write_json_atomic(
+                cache_file, dict(etag=response.headers["ETag"], stac_dict=stac_dict)
+            )
+        return stac_dict
+
+    def _traverse_stac(self, url: str, url_dict: Dict) -> Dict:
+        """
+        Threaded EE STAC tree traversal that returns the `url_dict` i.e. a dict with image/collection IDs/names as
+        keys, and the corresponding json STAC URLs as values.
+        """
+        # traverse the tree breadth first with a single thread pool, submitting child links as their parents are read
+        with ThreadPoolExecutor(max_workers=self._max_threads) as executor:
+            futures = {executor.submit(self._get_stac_dict, url): url}
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    url = futures.pop(future)
+                    response_dict = future.result()
+                    if not response_dict or "type" not in response_dict:
+                        continue
+                    if response_dict["type"].lower() == "collection":
+                        # we have reached a leaf node
+                        gee_type = response_dict.get("gee:type", "")
+                        if gee_type.lower() in self._image_types:
+                            # we have reached an image / image collection leaf node
+                            url_dict[response_dict["id"]] = url
+                            logger.debug(
+                                f'ID: {response_dict["id"]}, Type: {gee_type}, URL: {url}'
+                            )
+                        continue
+
+                    for link in response_dict["links"]:
+                        if link["rel"].lower() == "child":
+                            child_future = executor.submit(
+                                self._get_stac_dict, link["href"]
+                            )
+                            futures[child_future] = link["href"]
         return url_dict
 
     def refresh_url_dict(self):
@@ -192,6 +251,12 @@ class StacCatalog:
         with open(filename, "w") as f:
             json.dump(self.url_dict, f)
 
+    def _resolve_name(self, name: str) -> str:
+        """Return the collection name of the image ID ``name`` if it has a STAC entry, otherwise return ``name``."""
+        # split_id() is memoised, so repeated lookups of images from the same collection are cheap
+        coll_name = utils.split_id(name)[0]
+        return coll_name if coll_name in self.url_dict else name
+
     def get_item_dict(self, name: str):
         """
         Get the raw STAC dict for a given an image/collection name/ID.
@@ -206,19 +271,63 @@ class StacCatalog:
         dict
             Image/collection STAC data in a dict, if it exists, otherwise None.
         """
-        coll_name = utils.split_id(name)[0]
-        if coll_name in self.url_dict:
-            name = coll_name
-
-        # store item dicts in a cache so we don't have to request them more than once
-        if name not in self._cache:
-            if name not in self.url_dict:
-                logger.warning(f"There is no STAC entry for: {name}")
-                self._cache[name] = None
-            else:
-                response = self._session.get(self.url_dict[name])
-                self._cache[name] = response.json()
-        return self._cache[name]
+        name = self._resolve_name(name)
+        try:
+            return self._lookup_item_dict(name)
+        except (requests.RequestException, ValueError) as ex:
+            # STAC data is optional, so don't fail on request errors
+            logger.warning(f"Could not read the STAC entry for {name}: {ex}")
+            return None
+
+    def _lookup_item_dict(self, name: str) -> Union[Dict, None]:
+        """
+        Return the STAC dict for the resolved ``name`` from the memory cache, or request and cache it.  Request
+        errors are raised and not cached.
+        """
+        # store item dicts in a least recently used cache so we don't have to request them more than once
+        with self._lock:
+            if name in self._cache:
+                self._cache.move_to_end(name)
+                return self._cache[name]
+
+        if name not in self.url_dict:
+            logger.warning(f"There is no STAC entry for: {name}")
+            item_dict = None
+        else:
+            item_dict = self._get_item_dict(name)
+        with self._lock:
+            self._cache_item(self._cache, name, item_dict)
+        return item_dict
+
+    def _cache_item(self, cache: OrderedDict, name: str, item):
+        """
+        Add ``item`` to the least recently used ``cache``, evicting the oldest item if it is full.  The caller must
+        hold ``_lock``.
+        """
+        cache[name] = item
+        cache.move_to_end(name)
+        if len(cache) > self._cache_maxsize:
+            cache.popitem(last=False)
+
+    def _get_item_dict(self, name: str) -> Dict:
+        """Request the STAC dict for ``name``, reading it from, and writing it to, the disk cache if enabled."""
+
+        def request_item_dict() -> Dict:
+            response = self._session.get(self.url_dict[name])
+            # raise on error responses, so that they are not cached
+            response.raise_for_status()
+            item_dict = _json_loads(response.content)
+            if not isinstance(item_dict, dict):
+                raise ValueError(f"Invalid STAC item for {name}: {item_dict}")
+            return item_dict
+
+        if self._cache_dir is None:
+            return request_item_dict()
+        key = hashlib.sha1(self.url_dict[name].encode()).hexdigest()
+        cache_file = pathlib.Path(self._cache_dir).joinpath(f"stac_{key}.json")
+        return utils.cached_json(
+            cache_file, request_item_dict, max_age=self._cache_max_age
+        )
 
     def get_item(self, name: str) -> StacItem:
         """
@@ -234,8 +343,81 @@ class StacCatalog:
         StacItem
             image/collection STAC container, if it exists, otherwise None.
         """
-        coll_name = utils.split_id(name)[0]
-        if coll_name in self.url_dict:
-            name = coll_name
-        item_dict = self.get_item_dict(name) if name is not None else {}
-        return StacItem(name, item_dict) if item_dict else None
+        name = self._resolve_name(name)
+        # store containers in a least recently used cache so their band properties are only parsed once, and wait
+        # on a request for the same container that is already in progress (e.g. from prefetch()) rather than repeat it
+        with self._lock:
+            if name in self._item_cache:
+                self._item_cache.move_to_end(name)
+                return self._item_cache[name]
+            future = self._pending_items.get(name)
+            if future is None:
+                future = self._pending_items[name] = Future()
+                is_owner = True
+            else:
+                is_owner = False
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            item_dict = self._lookup_item_dict(name) if name is not None else {}
+            stac_item = StacItem(name, item_dict) if item_dict else None
+        except (requests.RequestException, ValueError) as ex:
+            # STAC data is optional, so treat the item as missing on request errors, but don't cache it
+            logger.warning(f"Could not read the STAC entry for {name}: {ex}")
+            with self._lock:
+                del self._pending_items[name]
+            future.set_result(None)
+            return None
+        except Exception as ex:
+            with self._lock:
+                del self._pending_items[name]
+            future.set_exception(ex)
+            raise
+
+        with self._lock:
+            self._cache_item(self._item_cache, name, stac_item)
+            del self._pending_items[name]
+        future.set_result(stac_item)
+        return stac_item
+
+    def prefetch(self, names: Iterable[str]):
+        """
+        Retrieve STAC containers for the given image/collection names/IDs in background threads, so that later
+        :meth:`get_item` calls for them are served from the cache.
+
+        Parameters
+        ----------
+        names: iterable of str
+            IDs/names of the images/collections whose STAC containers to retrieve.
+        """
+        names = {self._resolve_name(name) for name in names if name}
+        with self._lock:
+            names = [
+                name
+                for name in names
+                if name not in self._item_cache and name not in self._pending_items
+            ]
+            if not names:
+                return
+            if self._prefetch_executor is None:
+                # a single pool is shared between calls, rather than one per call.  It is released by
+                # shutdown_prefetch().
+                self._prefetch_executor = ThreadPoolExecutor(
+                    max_workers=8, thread_name_prefix="stac_prefetch"
+                )
+        # get_item() dedupes concurrent requests for the same item, so later get_item() calls wait on these requests
+        # rather than repeating them.  Return without waiting for the requests to complete.
+        for name in names:
+            self._prefetch_executor.submit(self.get_item, name)
+
+    def shutdown_prefetch(self):
+        """
+        Cancel queued :meth:`prefetch` requests, and release the prefetch thread pool, without waiting for requests
+        in progress to complete.
+        """
+        with self._lock:
+            executor, self._prefetch_executor = self._prefetch_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
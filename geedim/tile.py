@@ -14,11 +14,15 @@
    limitations under the License.
 """
 
+import hashlib
+import json
 import logging
+import pathlib
+import shutil
 import threading
-import zipfile
+import time
 from io import BytesIO
-from typing import Optional
+from typing import Optional, Union
 
 import numpy as np
 import rasterio as rio
@@ -35,8 +39,19 @@ class Tile:
     # lock to prevent concurrent calls to ee.Image.getDownloadURL(), which can cause a seg fault in the standard
     # python networking libraries.
     _ee_lock = threading.Lock()
+    # chunk size (bytes) for copying download data
+    _chunk_size = 64 * 1024
+    # maximum age (s) of tiles in the download cache
+    _cache_max_age = 7 * 24 * 60 * 60
 
-    def __init__(self, exp_image, window: Window):
+    def __init__(
+        self,
+        exp_image,
+        window: Window,
+        crs: Optional[str] = None,
+        transform: Optional[Affine] = None,
+        image_key: Optional[str] = None,
+    ):
         """
         Class for downloading an Earth Engine image tile (a rectangular region of interest in the image).
 
@@ -46,14 +61,24 @@ class Tile:
             BaseImage instance to derive the tile from.
         window: Window
             rasterio window into `exp_image`, specifying the region of interest for this tile.
+        crs: str, optional
+            CRS of `exp_image`.  If None, it is read from `exp_image`.
+        transform: Affine, optional
+            Geo-transform of `exp_image`.  If None, it is read from `exp_image`.
+        image_key: str, optional
+            Hash of the serialised `exp_image` Earth Engine image, used to key the tile download cache.  If None, it is
+            found from `exp_image` when needed.
         """
         self._exp_image = exp_image
         self._window = window
+        self._crs = crs or exp_image.crs
+        transform = transform or exp_image.transform
         # offset the image geo-transform origin so that it corresponds to the UL corner of the tile.
-        self._transform = exp_image.transform * Affine.translation(
+        self._transform = transform * Affine.translation(
             window.col_off, window.row_off
         )
         self._shape = (window.height, window.width)
+        self._image_key = image_key
 
     @property
     def window(self) -> Window:
@@ -65,42 +90,66 @@ class Tile:
         session: Optional[requests.Session] = None,
         num_threads: Optional[int] = None,
     ):
-        """Get tile download url and response."""
+        """
+        Get tile download url and response.  If ``session`` is provided, it is used as is, and should be configured
+        with a connection pool of at least ``num_threads``.  Otherwise a new session is created.
+        """
         if session is None:
             session = requests.Session()
-        if num_threads is not None:
-            adapter = requests.adapters.HTTPAdapter(pool_maxsize=num_threads)
-            session.mount("https://", adapter)
+            if num_threads is not None:
+                adapter = requests.adapters.HTTPAdapter(pool_maxsize=num_threads)
+                session.mount("https://", adapter)
         with self._ee_lock:
             url = self._exp_image.ee_image.getDownloadURL(
                 dict(
-                    crs=self._exp_image.crs,
+                    crs=self._crs,
                     crs_transform=tuple(self._transform)[:6],
                     dimensions=self._shape[::-1],
-                    filePerBand=False,
-                    fileFormat="GeoTIFF",
+                    format="GEO_TIFF",
                 )
             )
         return session.get(url, stream=True), url
 
-    def download(self, session=None, response=None, num_threads=None):
+    @staticmethod
+    def image_key(ee_image) -> str:
+        """Return a hash of the serialised ``ee_image``, for use in tile cache keys."""
+        return hashlib.sha1(ee_image.serialize().encode()).hexdigest()
+
+    def _cache_key(self) -> str:
+        """Return a key that uniquely identifies the tile download, for use as a cache file name."""
+        # serialising the image is costly, so use the key shared between tiles of the same image if there is one
+        image_key = self._image_key or self.image_key(self._exp_image.ee_image)
+        key_list = [
+            image_key,
+            self._crs,
+            tuple(self._transform)[:6],
+            self._shape,
+        ]
+        return hashlib.sha1(json.dumps(key_list).encode()).hexdigest()
+
+    def _download_buffer(
+        self,
+        session=None,
+        response=None,
+        num_threads=None,
+        cache_dir: Optional[Union[str, pathlib.Path]] = None,
+    ) -> BytesIO:
         """
-        Download the image tile into a numpy array.
-
-        Parameters
-        ----------
-        session: requests.Session, optional
-            requests session to use for downloading
-        response: requests.Response, optional
-            Response to a get request on the tile download url.
-        num_threads: int, optional
-            Number of threads used for download
-
-        Returns
-        -------
-        array: numpy.ndarray
-            3D numpy array of the tile pixel data with bands down the first dimension.
+        Download the image tile GeoTIFF into a buffer.  See :meth:`download` for parameter descriptions.  This is the
+        network I/O bound part of :meth:`download`.
         """
+        # read the tile from the cache if it is there
+        cache_file = None
+        if cache_dir is not None and response is None:
+            cache_file = pathlib.Path(cache_dir).joinpath(
+                f"tile_{self._cache_key()}.tif"
+            )
+            if (
+                cache_file.exists()
+                and (time.time() - cache_file.stat().st_mtime) < self._cache_max_age
+            ):
+                logger.debug(f"Reading tile from cache: {cache_file}")
+                return BytesIO(cache_file.read_bytes())
 
         # get image download url and response
         if response is None:
@@ -123,19 +172,28 @@ class Tile:
                 ex_msg = str(response.json())
             raise IOError(ex_msg)
 
-        # download zip into buffer
-        zip_buffer = BytesIO()
-        for data in response.iter_content(chunk_size=10240):
-            zip_buffer.write(data)
-        zip_buffer.flush()
+        # download geotiff into buffer (copy the raw stream in large chunks, decoding any transfer encoding)
+        buffer = BytesIO()
+        response.raw.decode_content = True
+        shutil.copyfileobj(response.raw, buffer, length=self._chunk_size)
 
-        # extract geotiff from zipped buffer into another buffer
-        zip_file = zipfile.ZipFile(zip_buffer)
-        ext_buffer = BytesIO(zip_file.read(zip_file.filelist[0]))
+        if cache_file is not None:
+            utils.write_bytes_atomic(cache_file, buffer.getbuffer())
+        return buffer
+
+    @staticmethod
+    def _read_buffer(buffer: BytesIO) -> np.ndarray:
+        """
+        Decode the GeoTIFF in a tile buffer into a numpy array.  This is the CPU bound part of :meth:`download`.
+        """
+        # the tile is downloaded as a GeoTIFF, rather than the Earth Engine default of a zipped GeoTIFF, so the
+        # buffer bytes can be passed directly to MemoryFile without extracting them first
+        with buffer:
+            tif_bytes = buffer.getvalue()
 
         # read the geotiff with a rasterio memory file
         env = rio.Env(GDAL_NUM_THREADS="ALL_CPUs", GTIFF_FORCE_RGBA=False, err="quiet")
-        with utils.suppress_rio_logs(), env, MemoryFile(ext_buffer) as mem_file:
+        with utils.suppress_rio_logs(), env, MemoryFile(tif_bytes) as mem_file:
             with mem_file.open() as ds:
                 array = ds.read()
                 if (array.dtype == np.dtype("float32")) or (
@@ -146,3 +204,32 @@ class Tile:
                     array[np.isinf(array)] = np.nan
 
         return array
+
+    def download(self, session=None, response=None, num_threads=None, cache_dir=None):
+        """
+        Download the image tile into a numpy array.
+
+        Parameters
+        ----------
+        session: requests.Session, optional
+            requests session to use for downloading
+        response: requests.Response, optional
+            Response to a get request on the tile download url.
+        num_threads: int, optional
+            Number of threads used for download
+        cache_dir: str, pathlib.Path, optional
+            Directory in which to cache tile downloads.  Tiles found in the cache are read from it rather than
+            downloaded.  If None, tiles are not cached.
+
+        Returns
+        -------
+        array: numpy.ndarray
+            3D numpy array of the tile pixel data with bands down the first dimension.
+        """
+        buffer = self._download_buffer(
+            session=session,
+            response=response,
+            num_threads=num_threads,
+            cache_dir=cache_dir,
+        )
+        return self._read_buffer(buffer)
@@ -14,28 +14,32 @@
    limitations under the License.
 """
 
+import functools
+import hashlib
 import itertools
 import json
 import logging
+import math
 import os
 import pathlib
 import sys
 import time
 from contextlib import contextmanager
-from threading import Thread
-from typing import Optional, Tuple
+from threading import Thread, get_ident
+from typing import Any, Callable, Optional, Tuple, Union
 
 import ee
 import numpy as np
 import rasterio as rio
 import requests
+from rasterio import MemoryFile
 from rasterio.crs import CRS
+from rasterio.enums import Compression
 from rasterio.env import GDALVersion
 from rasterio.warp import transform_geom
 from rasterio.windows import Window
 from requests.adapters import HTTPAdapter, Retry
 from shapely import Polygon
-from tqdm.auto import tqdm
 
 from geedim.enums import ResamplingMethod
 
@@ -96,6 +100,7 @@ def singleton(cls):
     return getinstance
 
 
+@functools.lru_cache(maxsize=4096)
 def split_id(image_id: str) -> Tuple[str, str]:
     """
     Split Earth Engine image ID into collection and index components.
@@ -112,11 +117,81 @@ def split_id(image_id: str) -> Tuple[str, str]:
     """
     if not image_id:
         return None, None
-    index = image_id.split("/")[-1]
-    ee_coll_name = "/".join(image_id.split("/")[:-1])
+    ee_coll_name, _, index = image_id.rpartition("/")
     return ee_coll_name, index
 
 
+def get_info(
+    ee_obj: ee.ComputedObject,
+    cache_dir: Optional[Union[str, pathlib.Path]] = None,
+    max_age: float = 24 * 60 * 60,
+) -> Any:
+    """
+    Return ``ee_obj.getInfo()``, optionally caching the result on disk.
+
+    Parameters
+    ----------
+    ee_obj: ee.ComputedObject
+        Earth Engine object to retrieve.
+    cache_dir: str, pathlib.Path, optional
+        Directory in which to cache results, keyed by the serialized ``ee_obj``.  If None, results are not cached.
+    max_age: float, optional
+        Maximum age (s) of a cached result.  Older results are retrieved from Earth Engine again.
+
+    Returns
+    -------
+    Any
+        The client side value of ``ee_obj``.
+    """
+    if cache_dir is None:
+        return ee_obj.getInfo()
+
+    key = hashlib.sha1(ee_obj.serialize().encode()).hexdigest()
+    cache_file = pathlib.Path(cache_dir).joinpath(f"{key}.json")
+    return cached_json(cache_file, ee_obj.getInfo, max_age=max_age)
+
+
+def cached_json(
+    cache_file: pathlib.Path, get_value: Callable[[], Any], max_age: float
+) -> Any:
+    """
+    Return the JSON value cached in ``cache_file`` if it is younger than ``max_age`` seconds, otherwise return
+    ``get_value()`` and cache it in ``cache_file``.
+    """
+    if cache_file.exists() and (time.time() - cache_file.stat().st_mtime) < max_age:
+        return json.loads(cache_file.read_text())
+
+    value = get_value()
+    write_json_atomic(cache_file, value)
+    return value
+
+
+def write_bytes_atomic(filename: pathlib.Path, data: bytes):
+    """Write ``data`` to ``filename`` so that concurrent readers never see a partially written file."""
+    # write to a temporary file unique to this process and thread, then rename
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = filename.with_name(f"{filename.name}.{os.getpid()}.{get_ident()}.tmp")
+    tmp_file.write_bytes(data)
+    tmp_file.replace(filename)
+
+
+def write_json_atomic(filename: pathlib.Path, value: Any):
+    """Write ``value`` to the JSON file ``filename`` so that concurrent readers never see a partially written file."""
+    write_bytes_atomic(filename, json.dumps(value).encode())
+
+
+def prune_cache(cache_dir: Union[str, pathlib.Path], pattern: str, max_age: float):
+    """Delete the files in ``cache_dir`` that match ``pattern``, and are older than ``max_age`` seconds."""
+    now = time.time()
+    for cache_file in pathlib.Path(cache_dir).glob(pattern):
+        try:
+            if (now - cache_file.stat().st_mtime) >= max_age:
+                cache_file.unlink()
+        except FileNotFoundError:
+            # the file was deleted by a concurrent download
+            pass
+
+
 @contextmanager
 def suppress_rio_logs(level: int = logging.ERROR):
     """A context manager that sets the `rasterio` logging level, then returns it to its original value."""
@@ -133,6 +208,22 @@ def suppress_rio_logs(level: int = logging.ERROR):
         logging.getLogger("rasterio._env").setLevel(rio_env_level)
 
 
+@functools.lru_cache(maxsize=None)
+def gtiff_zstd_supported() -> bool:
+    """Return True if the GDAL GeoTIFF driver supports ZSTD compression, otherwise False."""
+    try:
+        # GDAL warns and writes uncompressed data if ZSTD is not supported, so test by writing and reading back a
+        # small in-memory file
+        with suppress_rio_logs(logging.CRITICAL), MemoryFile() as mem_file:
+            profile = dict(driver="GTiff", width=1, height=1, count=1, dtype="uint8")
+            with mem_file.open(**profile, compress="zstd") as ds:
+                ds.write(np.zeros((1, 1, 1), dtype="uint8"))
+            with mem_file.open() as ds:
+                return ds.compression == Compression.zstd
+    except Exception:
+        return False
+
+
 def get_bounds(filename: pathlib.Path, expand: float = 5):
     """
     Get a geojson polygon representing the bounds of an image.
@@ -172,9 +263,13 @@ def get_bounds(filename: pathlib.Path, expand: float = 5):
         ]
 
         bbox_expand_dict = dict(type="Polygon", coordinates=[coordinates])
-        src_bbox_wgs84 = transform_geom(
-            im.crs, "WGS84", bbox_expand_dict
-        )  # convert to WGS84 geojson
+        if im.crs.to_epsg() == 4326:
+            # the bounds are already in WGS84, so avoid the cost of a transform
+            src_bbox_wgs84 = bbox_expand_dict
+        else:
+            src_bbox_wgs84 = transform_geom(
+                im.crs, "WGS84", bbox_expand_dict
+            )  # convert to WGS84 geojson
     return src_bbox_wgs84
 
 
@@ -201,22 +296,12 @@ def get_projection(image, min_scale=True):
 
     bands = image.bandNames()
 
-    compare = ee.Number.lte if min_scale else ee.Number.gte
-    init_proj = image.select(0).projection()
-
-    def compare_scale(name, prev_proj):
-        """Server side comparison of band scales"""
-        prev_proj = ee.Projection(prev_proj)
-        prev_scale = prev_proj.nominalScale()
-
-        curr_proj = image.select([name]).projection()
-        curr_scale = ee.Number(curr_proj.nominalScale())
-
-        condition = compare(curr_scale, prev_scale)
-        comp_proj = ee.Algorithms.If(condition, curr_proj, prev_proj)
-        return ee.Projection(comp_proj)
-
-    return ee.Projection(bands.iterate(compare_scale, init_proj))
+    # Map (rather than iterate) over bands to find their scales, then select the band with the min/max scale.  Where
+    # more than one band has the min/max scale, the last is selected.
+    scales = bands.map(lambda name: image.select([name]).projection().nominalScale())
+    scale = scales.reduce(ee.Reducer.min() if min_scale else ee.Reducer.max())
+    index = scales.lastIndexOfSubList(ee.List([scale]))
+    return image.select(ee.List([bands.get(index)])).projection()
 
 
 class Spinner(Thread):
@@ -255,6 +340,9 @@ class Spinner(Thread):
 
     def run(self):
         """Run the spinner thread."""
+        # import tqdm here, rather than at module level, so that importing geedim does not pay its import time
+        from tqdm.auto import tqdm
+
         cursors_it = itertools.cycle(r"/-\|")
 
         while self._run:
@@ -331,8 +419,12 @@ def retry_session(
     backoff_factor: float = 0.3,
     status_forcelist: Tuple = (429, 500, 502, 503, 504),
     session: requests.Session = None,
+    pool_maxsize: int = requests.adapters.DEFAULT_POOLSIZE,
 ) -> requests.Session:
-    """requests session configured for retries."""
+    """
+    requests session configured for retries.  ``pool_maxsize`` is the number of connections to keep alive per host,
+    and should be at least the number of threads sharing the session.
+    """
     session = session or requests.Session()
     retry = Retry(
         total=retries,
@@ -341,7 +433,7 @@ def retry_session(
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = HTTPAdapter(max_retries=retry, pool_maxsize=pool_maxsize)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
@@ -366,10 +458,11 @@ def expand_window_to_grid(
     rasterio.windows.Window
         Expanded window.
     """
-    col_off, col_frac = np.divmod(win.col_off - expand_pixels[1], 1)
-    row_off, row_frac = np.divmod(win.row_off - expand_pixels[0], 1)
-    width = np.ceil(win.width + 2 * expand_pixels[1] + col_frac)
-    height = np.ceil(win.height + 2 * expand_pixels[0] + row_frac)
+    # use python builtins rather than numpy for these scalar operations
+    col_off, col_frac = divmod(win.col_off - expand_pixels[1], 1)
+    row_off, row_frac = divmod(win.row_off - expand_pixels[0], 1)
+    width = math.ceil(win.width + 2 * expand_pixels[1] + col_frac)
+    height = math.ceil(win.height + 2 * expand_pixels[0] + row_frac)
     exp_win = Window(int(col_off), int(row_off), int(width), int(height))
     return exp_win
 
@@ -54,10 +54,11 @@ setup(
         "rasterio>=1.1",
         "click>=8",
         "tqdm>=4.6",
-        "earthengine-api>=0.1.2",
+        "earthengine-api>=0.1.292",
         "requests>=2.2",
         "tabulate>=0.8",
     ],
+    extras_require={"speedups": ["orjson>=3"]},
     python_requires=">=3.6",
     classifiers=[
         "Programming Language :: Python :: 3",
@@ -13,6 +13,7 @@
     See the License for the specific language governing permissions and
     limitations under the License.
 """
+import os
 import pathlib
 from typing import Dict, List
 
@@ -21,15 +22,38 @@ import pytest
 from click.testing import CliRunner
 
 from geedim import Initialize, MaskedImage
+from geedim.download import BaseImage
 from geedim.utils import root_path
 
 
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "no_ee: the test does not need Earth Engine to be initialised"
+    )
+
+
 @pytest.fixture(scope="session", autouse=True)
-def ee_init():
+def ee_init(request: pytest.FixtureRequest):
+    # skip initialisation (and authentication) when none of the collected tests need Earth Engine
+    if all(item.get_closest_marker("no_ee") for item in request.session.items):
+        return
     Initialize()
     return
 
 
+@pytest.fixture(scope="session", autouse=True)
+def info_cache_dir():
+    """
+    Cache Earth Engine image metadata on disk when the GEEDIM_TEST_INFO_CACHE_DIR environment variable is set, so that
+    repeat test runs avoid metadata round trips.
+    """
+    prev_cache_dir = BaseImage._info_cache_dir
+    cache_dir = os.environ.get("GEEDIM_TEST_INFO_CACHE_DIR")
+    BaseImage._info_cache_dir = cache_dir
+    yield cache_dir
+    BaseImage._info_cache_dir = prev_cache_dir
+
+
 @pytest.fixture(scope="session")
 def region_25ha() -> Dict:
     """A geojson polygon defining a 500x500m region."""
@@ -31,6 +31,8 @@ from rasterio.transform import Affine
 from rasterio.warp import transform_geom
 
 from geedim.cli import cli
+from geedim.download import BaseImage
+from geedim.stac import StacCatalog
 from geedim.utils import asset_id, root_path
 
 
@@ -876,3 +878,11 @@ def test_search_composite_x2_download(
     with open(region_25ha_file) as f:
         region = json.load(f)
     _test_downloaded_file(out_files[0], region=region, crs="EPSG:3857", scale=30)
+
+
+def test_info_cache_dir_restored(runner: CliRunner, tmp_path: pathlib.Path):
+    """Test the --info-cache-dir setting applies to the command only, and is restored when it completes."""
+    prev_cache_dirs = (BaseImage._info_cache_dir, StacCatalog()._cache_dir)
+    result = runner.invoke(cli, ["--info-cache-dir", str(tmp_path), "config"])
+    assert result.exit_code == 0
+    assert (BaseImage._info_cache_dir, StacCatalog()._cache_dir) == prev_cache_dirs
@@ -21,7 +21,7 @@ import numpy as np
 import pytest
 
 from geedim import schema
-from geedim.collection import MaskedCollection
+from geedim.collection import MaskedCollection, parse_date
 from geedim.enums import CompositeMethod, ResamplingMethod
 from geedim.errors import InputImageError, UnfilteredError
 from geedim.mask import MaskedImage
@@ -526,6 +526,31 @@ def test_composite_region_date_ordering(image_list, method, region, date, reques
         assert all(sorted(im_date_diff, reverse=True) == im_date_diff)
 
 
+@pytest.mark.parametrize(
+    "image_list, method, date",
+    [
+        ("s2_sr_image_list", CompositeMethod.q_mosaic, None),
+        ("s2_sr_image_list", CompositeMethod.q_mosaic, "2021-10-01"),
+        ("l8_9_image_list", CompositeMethod.medoid, None),
+        ("l8_9_image_list", CompositeMethod.mosaic, "2021-10-01"),
+        ("l8_9_image_list", CompositeMethod.median, None),
+        ("l8_9_image_list", CompositeMethod.median, "2021-10-01"),
+    ],
+)
+def test_sort_properties(image_list, method, date, request):
+    """
+    Test MaskedCollection._sort_properties() sorts properties in the same order that
+    MaskedCollection._prepare_for_composite() sorts the collection, when no region is specified.
+    """
+    image_list: List = request.getfixturevalue(image_list)
+    gd_collection = MaskedCollection.from_list(image_list)
+    ee_collection = gd_collection._prepare_for_composite(method=method, date=date)
+    exp_properties = gd_collection._get_properties(ee_collection)
+    properties = gd_collection._sort_properties(
+        gd_collection.properties, method, date=parse_date(date)
+    )
+    assert list(properties.keys()) == list(exp_properties.keys())
+
 @pytest.mark.parametrize(
     "image_list, method, mask",
     [
@@ -767,6 +792,24 @@ def test_composite_mult_kwargs(region_100ha):
     assert cp_prob80 != pytest.approx(cp_prob40, abs=1e-1)
 
 
+def test_composite_cache_key(region_100ha: Dict):
+    """Test composite cache keys match for equal parameters, and are not created for Earth Engine parameters."""
+    cache_key = MaskedCollection._composite_cache_key
+    method, date = CompositeMethod.mosaic, datetime(2022, 1, 1)
+    key = cache_key(method, True, "near", date, region_100ha, dict(prob=60))
+
+    reordered_region = dict(reversed(list(region_100ha.items())))
+    assert key == cache_key(
+        method, True, ResamplingMethod.near, date, reordered_region, dict(prob=60)
+    )
+    assert key != cache_key(method, True, "near", date, region_100ha, dict(prob=40))
+
+    ee_region = ee.Geometry(region_100ha)
+    assert cache_key(method, True, "near", date, ee_region, {}) is None
+    ee_kwargs = dict(prob=ee.Number(60))
+    assert cache_key(method, True, "near", date, region_100ha, ee_kwargs) is None
+
+
 @pytest.mark.parametrize("name", ["FAO/WAPOR/2/L1_RET_E", "MODIS/006/MCD43A4"])
 def test_unbounded_search_no_region(name):
     """
@@ -792,3 +835,13 @@ def test_unknown_collection_error(region_25ha):
         gd_collection = gd_collection.search(start_date, end_date, region_25ha)
         _ = gd_collection.properties
     assert "not found" in str(ex)
+
+
+def test_properties_large_collection():
+    """Test MaskedCollection._get_properties() retrieves properties of collections with more than 5000 images."""
+    gd_collection = MaskedCollection.from_name("LANDSAT/LC08/C02/T1_L2")
+    num_images = 5001
+    properties = gd_collection._get_properties(
+        gd_collection.ee_collection.limit(num_images)
+    )
+    assert len(properties) == num_images
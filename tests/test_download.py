@@ -15,19 +15,22 @@
 """
 import copy
 import pathlib
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Tuple
 
 import ee
 import numpy as np
 import pytest
 import rasterio as rio
+import requests
 from rasterio import Affine, features, warp, windows
 from rasterio.crs import CRS
 
 from geedim import utils
 from geedim.download import BaseImage
 from geedim.enums import ExportType, ResamplingMethod
+from geedim.stac import StacCatalog
 
 
 class BaseImageLike:
@@ -39,11 +42,13 @@ class BaseImageLike:
         count: int = 10,
         dtype: str = "uint16",
         transform: Affine = Affine.identity(),
+        crs: str = "EPSG:3857",
     ):
         self.shape = shape
         self.count = count
         self.dtype = dtype
         self.transform = transform
+        self.crs = crs
         dtype_size = np.dtype(dtype).itemsize
         self.size = shape[0] * shape[1] * count * dtype_size
 
@@ -67,27 +72,51 @@ def user_fix_base_image() -> BaseImage:
 
 
 @pytest.fixture(scope="session")
-def s2_sr_base_image(s2_sr_image_id: str) -> BaseImage:
+def base_images(
+    s2_sr_image_id: str,
+    l9_image_id: str,
+    l8_image_id: str,
+    landsat_ndvi_image_id: str,
+    modis_nbar_image_id: str,
+    region_100ha: Dict,
+) -> Dict[str, BaseImage]:
+    """
+    A dictionary of BaseImage instances whose metadata is retrieved with a single Earth Engine call, rather than one
+    call per image.
+    """
+    images = dict(
+        s2_sr=BaseImage.from_id(s2_sr_image_id),
+        l9=BaseImage.from_id(l9_image_id),
+        l8=BaseImage.from_id(l8_image_id),
+        landsat_ndvi=BaseImage.from_id(landsat_ndvi_image_id),
+        modis_nbar=BaseImage(ee.Image(modis_nbar_image_id).clip(region_100ha)),
+    )
+    BaseImage._get_info_batch(list(images.values()))
+    return images
+
+
+@pytest.fixture(scope="session")
+def s2_sr_base_image(base_images: Dict[str, BaseImage]) -> BaseImage:
     """A BaseImage instance encapsulating a Sentinel-2 image.  Covers `region_*ha`."""
-    return BaseImage.from_id(s2_sr_image_id)
+    return base_images["s2_sr"]
 
 
 @pytest.fixture(scope="session")
-def l9_base_image(l9_image_id: str) -> BaseImage:
+def l9_base_image(base_images: Dict[str, BaseImage]) -> BaseImage:
     """A BaseImage instance encapsulating a Landsat-9 image.  Covers `region_*ha`."""
-    return BaseImage.from_id(l9_image_id)
+    return base_images["l9"]
 
 
 @pytest.fixture(scope="session")
-def l8_base_image(l8_image_id: str) -> BaseImage:
+def l8_base_image(base_images: Dict[str, BaseImage]) -> BaseImage:
     """A BaseImage instance encapsulating a Landsat-8 image.  Covers `region_*ha`."""
-    return BaseImage.from_id(l8_image_id)
+    return base_images["l8"]
 
 
 @pytest.fixture(scope="session")
-def landsat_ndvi_base_image(landsat_ndvi_image_id: str) -> BaseImage:
+def landsat_ndvi_base_image(base_images: Dict[str, BaseImage]) -> BaseImage:
     """A BaseImage instance encapsulating a Landsat NDVI composite image.  Covers `region_*ha`."""
-    return BaseImage.from_id(landsat_ndvi_image_id)
+    return base_images["landsat_ndvi"]
 
 
 @pytest.fixture(scope="session")
@@ -97,9 +126,9 @@ def modis_nbar_base_image_unbnd(modis_nbar_image_id: str) -> BaseImage:
 
 
 @pytest.fixture(scope="session")
-def modis_nbar_base_image(modis_nbar_image_id: str, region_100ha: Dict) -> BaseImage:
+def modis_nbar_base_image(base_images: Dict[str, BaseImage]) -> BaseImage:
     """A BaseImage instance encapsulating a MODIS NBAR image.  Covers `region_*ha`."""
-    return BaseImage(ee.Image(modis_nbar_image_id).clip(region_100ha))
+    return base_images["modis_nbar"]
 
 
 def bounds_polygon(
@@ -134,29 +163,26 @@ def _test_export_profile(exp_profile, tgt_profile, transform_shape=False):
 
     assert exp_profile["transform"][0] == tgt_profile["transform"][0]
 
+    # compare transforms and bounds as packed float arrays (absolute tolerance as for pytest.approx)
+    rtol = 1e-9 if transform_shape else 0.05
     if transform_shape:
         for key in ["width", "height"]:
             assert exp_profile[key] == tgt_profile[key]
-        assert exp_profile["transform"][:6] == pytest.approx(
-            tgt_profile["transform"][:6], rel=1e-9
-        )
-    else:
-        assert exp_profile["transform"][:6] == pytest.approx(
-            tgt_profile["transform"][:6], rel=0.05
-        )
-
-    tgt_bounds = windows.bounds(
-        windows.Window(0, 0, tgt_profile["width"], tgt_profile["height"]),
-        tgt_profile["transform"],
-    )
-    exp_bounds = windows.bounds(
-        windows.Window(0, 0, exp_profile["width"], exp_profile["height"]),
-        exp_profile["transform"],
+    assert np.allclose(
+        exp_profile["transform"][:6],
+        tgt_profile["transform"][:6],
+        rtol=rtol,
+        atol=1e-12,
     )
-    if transform_shape:
-        assert exp_bounds == pytest.approx(tgt_bounds, rel=1e-9)
-    else:
-        assert exp_bounds == pytest.approx(tgt_bounds, rel=0.05)
+
+    exp_bounds, tgt_bounds = [
+        windows.bounds(
+            windows.Window(0, 0, profile["width"], profile["height"]),
+            profile["transform"],
+        )
+        for profile in (exp_profile, tgt_profile)
+    ]
+    assert np.allclose(exp_bounds, tgt_bounds, rtol=rtol, atol=1e-12)
 
 
 def test_id_name(user_base_image: BaseImage, s2_sr_base_image: BaseImage):
@@ -232,6 +258,19 @@ def test_band_props(base_image: str, request: pytest.FixtureRequest):
         assert all(has_key)
 
 
+def test_get_info_batch(user_base_image: BaseImage, user_fix_base_image: BaseImage):
+    """Test BaseImage._get_info_batch() retrieves the same metadata as BaseImage._ee_info."""
+    base_images = [
+        BaseImage(user_base_image.ee_image),
+        BaseImage(user_fix_base_image.ee_image),
+    ]
+    BaseImage._get_info_batch(base_images)
+    for base_image, exp_base_image in zip(
+        base_images, [user_base_image, user_fix_base_image]
+    ):
+        assert base_image._BaseImage__ee_info == exp_base_image._ee_info
+
+
 def test_has_fixed_projection(
     user_base_image: BaseImage, user_fix_base_image: BaseImage, s2_sr_base_image
 ):
@@ -241,12 +280,17 @@ def test_has_fixed_projection(
     assert s2_sr_base_image.has_fixed_projection
 
 
+@pytest.mark.no_ee
 # yapf: disable
 @pytest.mark.parametrize(
     'ee_data_type_list, exp_dtype', [
         ([{'precision': 'int', 'min': 10, 'max': 11}, {'precision': 'int', 'min': 100, 'max': 101}], 'uint8'),
         ([{'precision': 'int', 'min': -128, 'max': -100}, {'precision': 'int', 'min': 0, 'max': 127}], 'int8'),
+        ([{'precision': 'int', 'min': 0, 'max': 255}], 'uint8'),
+        ([{'precision': 'int', 'min': 0, 'max': 1023}], 'uint16'),
         ([{'precision': 'int', 'min': 256, 'max': 257}], 'uint16'),
+        ([{'precision': 'int', 'min': 0, 'max': 65535}], 'uint16'),
+        ([{'precision': 'int', 'min': 0, 'max': 65536}], 'uint32'),
         ([{'precision': 'int', 'min': -32768, 'max': 32767}], 'int16'),
         ([{'precision': 'int', 'min': 2**15, 'max': 2**32 - 1}], 'uint32'),
         ([{'precision': 'int', 'min': -2**31, 'max': 2**31 - 1}], 'int32'),
@@ -270,6 +314,7 @@ def test_convert_dtype_error():
         BaseImage._convert_dtype(ee.Image(1), dtype="unknown")
 
 
+@pytest.mark.no_ee
 @pytest.mark.parametrize(
     "size, exp_str", [(1024, "1.02 KB"), (234.56e6, "234.56 MB"), (1e9, "1.00 GB")]
 )
@@ -408,6 +453,25 @@ def test_prepare_transform_shape(
     assert exp_image.scale == param_image.scale
 
 
+@pytest.fixture(scope="session")
+def clipped_images(region_25ha: Dict) -> Callable[[BaseImage], BaseImage]:
+    """
+    Return a function that copies a BaseImage session fixture and clips it to `region_25ha`.  Copies are cached, so
+    that their metadata is retrieved from Earth Engine once per session, rather than once per test.
+    """
+    cache = {}
+
+    def clipped_image(base_image: BaseImage) -> BaseImage:
+        if base_image not in cache:
+            # copy to avoid changing the session fixture
+            clip_image = copy.deepcopy(base_image)
+            clip_image.ee_image = clip_image.ee_image.clip(region_25ha)
+            cache[base_image] = clip_image
+        return cache[base_image]
+
+    return clipped_image
+
+
 @pytest.mark.parametrize(
     "base_image, param_image",
     [
@@ -429,14 +493,14 @@ def test_prepare_transform_shape(
     ],
 )  # yapf: disable
 def test_prepare_region_scale(
-    base_image: str, param_image: str, region_25ha: dict, request: pytest.FixtureRequest
+    base_image: str,
+    param_image: str,
+    clipped_images: Callable[[BaseImage], BaseImage],
+    request: pytest.FixtureRequest,
 ):
     """Test BaseImage._prepare_for_export() with region and scale parameters."""
     base_image: BaseImage = request.getfixturevalue(base_image)
-    _param_image: BaseImage = request.getfixturevalue(param_image)
-    param_image = copy.deepcopy(_param_image)  # avoid changing session fixture
-    # clip param_image, so that param_image.transform can be tested against below
-    param_image.ee_image = param_image.ee_image.clip(region_25ha)
+    param_image: BaseImage = clipped_images(request.getfixturevalue(param_image))
 
     exp_params = dict(
         crs=param_image.crs,
@@ -581,24 +645,29 @@ def test_scale_offset(
     assert all(np.array(list(exp_max.values())) <= 1.5)
 
 
+@pytest.mark.no_ee
 def test_tile_shape():
     """Test BaseImage._get_tile_shape() satisfies the tile size limit for different image shapes."""
     max_tile_dim = 10000
+    count = 10
+    pixel_size = count * np.dtype("uint16").itemsize
 
     for max_tile_size in range(4, 32, 4):
+        max_tile_bytes = max_tile_size << 20
         for height in range(1, 11000, 100):
             for width in range(1, 11000, 100):
-                exp_shape = (height, width)
-                exp_image = BaseImageLike(shape=exp_shape)  # emulate a BaseImage
+                # emulate a BaseImage
+                exp_image = BaseImageLike(shape=(height, width), count=count)
                 tile_shape, num_tiles = exp_image._get_tile_shape(
                     max_tile_size=max_tile_size, max_tile_dim=max_tile_dim
                 )
-                assert all(np.array(tile_shape) <= np.array(exp_shape))
-                assert all(np.array(tile_shape) <= max_tile_dim)
-                tile_image = BaseImageLike(shape=tile_shape)
-                assert tile_image.size <= (max_tile_size << 20)
+                # compare with plain python ints, avoiding numpy array allocation in this large loop
+                assert tile_shape[0] <= height and tile_shape[1] <= width
+                assert tile_shape[0] <= max_tile_dim and tile_shape[1] <= max_tile_dim
+                assert tile_shape[0] * tile_shape[1] * pixel_size <= max_tile_bytes
 
 
+@pytest.mark.no_ee
 @pytest.mark.parametrize(
     "image_shape, tile_shape, image_transform",
     [
@@ -612,34 +681,34 @@ def test_tiles(image_shape: Tuple, tile_shape: Tuple, image_transform: Affine):
     exp_image = BaseImageLike(shape=image_shape, transform=image_transform)
     tiles = [tile for tile in exp_image._tiles(tile_shape=tile_shape)]
 
-    # test window coverage, and window & transform continuity
-    prev_tile = tiles[0]
-    accum_window = prev_tile.window
-    for tile in tiles[1:]:
-        accum_window = windows.union(accum_window, tile.window)
-        assert all(np.array(tile._shape) <= np.array(tile_shape))
-
-        if tile.window.row_off == prev_tile.window.row_off:
-            assert tile.window.col_off == (
-                prev_tile.window.col_off + prev_tile.window.width
-            )
-            assert tile._transform == pytest.approx(
-                (prev_tile._transform * Affine.translation(prev_tile.window.width, 0)),
-                rel=0.001,
-            )
-        else:
-            assert tile.window.row_off == (
-                prev_tile.window.row_off + prev_tile.window.height
-            )
-            assert tile._transform == pytest.approx(
-                prev_tile._transform
-                * Affine.translation(
-                    -prev_tile.window.col_off, prev_tile.window.height
-                ),
-                rel=0.001,
-            )
-        prev_tile = tile
-    assert (accum_window.height, accum_window.width) == exp_image.shape
+    # find the expected (row, column) tile offsets & shapes on a row-major grid that covers the image
+    row_offs, col_offs = np.meshgrid(
+        np.arange(0, image_shape[0], tile_shape[0]),
+        np.arange(0, image_shape[1], tile_shape[1]),
+        indexing="ij",
+    )
+    exp_offs = np.column_stack((row_offs.ravel(), col_offs.ravel()))
+    exp_shapes = np.minimum(tile_shape, np.array(image_shape) - exp_offs)
+
+    # test window coverage & continuity
+    win_array = np.array(
+        [
+            (t.window.row_off, t.window.col_off, t.window.height, t.window.width)
+            for t in tiles
+        ]
+    )
+    assert np.array_equal(win_array[:, :2], exp_offs)
+    assert np.array_equal(win_array[:, 2:], exp_shapes)
+    # the bounding box of all tile windows is the image extent
+    accum_shape = (win_array[:, :2] + win_array[:, 2:]).max(axis=0)
+    assert tuple(accum_shape) == exp_image.shape
+
+    # test tile transforms are the image transform translated to the tile offsets
+    transforms = np.array([tile._transform[:6] for tile in tiles])
+    exp_transforms = np.array(
+        [(image_transform * Affine.translation(c, r))[:6] for r, c in exp_offs]
+    )
+    assert np.allclose(transforms, exp_transforms, rtol=0.001)
 
 
 def test_download_transform_shape(
@@ -822,6 +891,34 @@ def test_bounded(base_image: str, exp_value: bool, request: pytest.FixtureReques
     assert base_image.bounded == exp_value
 
 
+
+def test_download_stac_error(
+    l9_image_id: str,
+    region_25ha: Dict,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test download() writes the file when the STAC item request fails."""
+    stac_catalog = StacCatalog()
+
+    def get(url: str, **kwargs) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 500
+        response.url = url
+        return response
+
+    monkeypatch.setattr(stac_catalog._session, "get", get)
+    monkeypatch.setattr(stac_catalog, "_cache", OrderedDict())
+    monkeypatch.setattr(stac_catalog, "_item_cache", OrderedDict())
+    monkeypatch.setattr(stac_catalog, "_cache_dir", None)
+
+    # use a new BaseImage so that the shared fixture's STAC item is not replaced
+    base_image = BaseImage.from_id(l9_image_id)
+    filename = tmp_path.joinpath("test.tif")
+    base_image.download(filename, region=region_25ha)
+    assert filename.exists()
+    assert base_image._stac is None
+
 # TODO:
 # - export(): test an export of small file
 # - different generic collection images are downloaded ok (perhaps this goes with MaskedImage more than BaseImage)
@@ -13,9 +13,17 @@
     See the License for the specific language governing permissions and
     limitations under the License.
 """
+import json
+import pathlib
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from typing import Dict
 
 import pytest
+import requests
 
 from geedim.stac import StacCatalog, StacItem
 from geedim.utils import split_id
@@ -142,3 +150,141 @@ def test_stac_item_descriptions(
     assert stac_item.descriptions is not None
     assert len(stac_item.descriptions) > 0
     assert len(list(stac_item.descriptions.values())[0]) > 0
+
+
+def test_get_item_dict_cache(
+    stac_catalog: StacCatalog, s2_sr_image_id: str, tmp_path: pathlib.Path
+):
+    """Test get_item_dict() reads from and writes to the disk cache when ``_cache_dir`` is set."""
+    coll_name, _ = split_id(s2_sr_image_id)
+    try:
+        stac_catalog._cache_dir = tmp_path
+        item_dict = stac_catalog._get_item_dict(coll_name)
+        cache_files = list(tmp_path.glob("stac_*.json"))
+        assert len(cache_files) == 1
+
+        # the second request should come from the cache file, not the STAC
+        cache_files[0].write_text(json.dumps(dict(id="cached")))
+        assert stac_catalog._get_item_dict(coll_name) == dict(id="cached")
+        assert item_dict["id"] == coll_name
+    finally:
+        stac_catalog._cache_dir = None
+
+
+def test_get_item_cache(stac_catalog: StacCatalog, s2_sr_image_id: str):
+    """Test get_item() returns the cached StacItem instance for repeat lookups of the same collection."""
+    coll_name, _ = split_id(s2_sr_image_id)
+    stac_item = stac_catalog.get_item(coll_name)
+    assert stac_item is not None
+    assert stac_catalog.get_item(s2_sr_image_id) is stac_item
+
+
+def test_prefetch(stac_catalog: StacCatalog, l9_image_id: str):
+    """Test prefetch() populates the StacItem cache."""
+    coll_name, _ = split_id(l9_image_id)
+    stac_catalog._item_cache.pop(coll_name, None)
+    stac_catalog.prefetch([l9_image_id])
+    # get_item() returns the prefetched item if the prefetch has completed, and retrieves it otherwise
+    stac_item = stac_catalog.get_item(l9_image_id)
+    assert stac_item is not None
+    assert coll_name in stac_catalog._item_cache
+
+
+@pytest.mark.no_ee
+def test_get_item_concurrent(
+    stac_catalog: StacCatalog, monkeypatch: pytest.MonkeyPatch
+):
+    """Test concurrent get_item() calls for the same item share a single request."""
+    name = "test/get_item_concurrent"
+    calls = []
+    release = threading.Event()
+
+    def get_item_dict(name: str) -> Dict:
+        calls.append(name)
+        release.wait(5)
+        return dict(id=name)
+
+    monkeypatch.setattr(stac_catalog, "_lookup_item_dict", get_item_dict)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(stac_catalog.get_item, name) for _ in range(4)]
+        # let the threads queue on the pending request before it completes
+        time.sleep(0.5)
+        release.set()
+        stac_items = [future.result() for future in futures]
+
+    assert len(calls) == 1
+    assert all(stac_item is stac_items[0] for stac_item in stac_items)
+    assert stac_catalog._pending_items == {}
+
+
+@pytest.mark.no_ee
+def test_get_item_dict_cache_error(
+    stac_catalog: StacCatalog,
+    s2_sr_image_id: str,
+    tmp_path: pathlib.Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """Test get_item_dict() raises on an error response, and does not write it to the disk cache."""
+    coll_name, _ = split_id(s2_sr_image_id)
+
+    def get(url: str, **kwargs) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 503
+        response.url = url
+        response._content = b'{"error": "unavailable"}'
+        return response
+
+    monkeypatch.setattr(stac_catalog._session, "get", get)
+    monkeypatch.setattr(stac_catalog, "_cache_dir", tmp_path)
+    with pytest.raises(requests.HTTPError):
+        stac_catalog._get_item_dict(coll_name)
+    assert len(list(tmp_path.glob("stac_*.json"))) == 0
+
+
+@pytest.mark.no_ee
+def test_get_item_error(
+    stac_catalog: StacCatalog, s2_sr_image_id: str, monkeypatch: pytest.MonkeyPatch
+):
+    """Test get_item() and get_item_dict() return None on an error response, and do not cache it."""
+    coll_name, _ = split_id(s2_sr_image_id)
+
+    def get(url: str, **kwargs) -> requests.Response:
+        response = requests.Response()
+        response.status_code = 500
+        response.url = url
+        return response
+
+    monkeypatch.setattr(stac_catalog._session, "get", get)
+    monkeypatch.setattr(stac_catalog, "_cache", OrderedDict())
+    monkeypatch.setattr(stac_catalog, "_item_cache", OrderedDict())
+    monkeypatch.setattr(stac_catalog, "_cache_dir", None)
+    assert stac_catalog.get_item_dict(coll_name) is None
+    assert stac_catalog.get_item(coll_name) is None
+    assert coll_name not in stac_catalog._cache
+    assert coll_name not in stac_catalog._item_cache
+    assert stac_catalog._pending_items == {}
+
+
+@pytest.mark.no_ee
+def test_shutdown_prefetch(stac_catalog: StacCatalog, monkeypatch: pytest.MonkeyPatch):
+    """Test shutdown_prefetch() cancels queued prefetch requests and releases the pool."""
+    calls = []
+    release = threading.Event()
+
+    def get_item_dict(name: str) -> Dict:
+        calls.append(name)
+        release.wait(5)
+        return dict(id=name)
+
+    monkeypatch.setattr(stac_catalog, "_lookup_item_dict", get_item_dict)
+    stac_catalog.shutdown_prefetch()
+    names = [f"test/shutdown_prefetch_{i}" for i in range(32)]
+    stac_catalog.prefetch(names)
+    executor = stac_catalog._prefetch_executor
+    stac_catalog.shutdown_prefetch()
+    release.set()
+    executor.shutdown(wait=True)
+
+    assert stac_catalog._prefetch_executor is None
+    assert len(calls) <= executor._max_workers < len(names)
+    assert stac_catalog._pending_items == {}
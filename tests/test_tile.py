@@ -78,3 +78,31 @@ def test_download(base_image_like, session):
     for i in range(3):
         assert np.all(array[i] == i + 1)
     assert bar.n == pytest.approx(raw_download_size, rel=0.01)
+
+
+def test_download_cache(base_image_like, tmp_path, monkeypatch):
+    """Test a cached tile download is written to, and read from, the cache directory."""
+    window = Window(0, 0, *base_image_like.shape[::-1])
+    tile = Tile(base_image_like, window)
+    array = tile.download(cache_dir=tmp_path)
+
+    cache_files = list(tmp_path.glob("*.tif"))
+    assert len(cache_files) == 1
+    assert cache_files[0].stem == f"tile_{tile._cache_key()}"
+
+    # the second download should be read from the cache without any network access
+    def get_download_url_response(*args, **kwargs):
+        raise AssertionError("Cached tile was downloaded.")
+
+    monkeypatch.setattr(Tile, "_get_download_url_response", get_download_url_response)
+    cached_array = tile.download(cache_dir=tmp_path)
+    assert np.all(cached_array == array)
+
+
+def test_cache_key_image_key(base_image_like):
+    """Test a tile cache key is the same with and without a shared image key."""
+    window = Window(0, 0, *base_image_like.shape[::-1])
+    image_key = Tile.image_key(base_image_like.ee_image)
+    tile = Tile(base_image_like, window)
+    key_tile = Tile(base_image_like, window, image_key=image_key)
+    assert key_tile._cache_key() == tile._cache_key()
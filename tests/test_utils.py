@@ -14,6 +14,7 @@
     limitations under the License.
 """
 
+import os
 import time
 from typing import Dict
 
@@ -27,7 +28,9 @@ from geedim.utils import (
     Spinner,
     asset_id,
     get_bounds,
+    get_info,
     get_projection,
+    prune_cache,
     resample,
     split_id,
 )
@@ -66,6 +69,36 @@ def test_get_projection(s2_sr_masked_image):
     assert min_scale == 10
 
 
+def test_get_info_cache(tmp_path):
+    """Test get_info() caches results in, and reads results from, the cache directory."""
+    ee_obj = ee.Dictionary(dict(a=1, b="two"))
+    info = get_info(ee_obj, cache_dir=tmp_path)
+    assert info == ee_obj.getInfo()
+    cache_files = list(tmp_path.glob("*.json"))
+    assert len(cache_files) == 1
+
+    cache_files[0].write_text('{"a": 3}')
+    assert get_info(ee_obj, cache_dir=tmp_path) == dict(a=3)
+    assert get_info(ee_obj, cache_dir=tmp_path, max_age=0) == info
+
+
+@pytest.mark.no_ee
+def test_prune_cache(tmp_path):
+    """Test prune_cache() deletes only the matching files older than the maximum age."""
+    filenames = ["tile_old.tif", "tile_new.tif", "other.tif"]
+    for filename in filenames:
+        tmp_path.joinpath(filename).write_bytes(b"")
+    old_time = time.time() - 100
+    for filename in ["tile_old.tif", "other.tif"]:
+        os.utime(tmp_path.joinpath(filename), (old_time, old_time))
+
+    prune_cache(tmp_path, "tile_*.tif", max_age=50)
+    assert sorted(file.name for file in tmp_path.iterdir()) == [
+        "other.tif",
+        "tile_new.tif",
+    ]
+
+
 def test_spinner():
     """Test Spinner class."""
     spinner = Spinner(label="test", interval=0.1)